@@ -1,3 +1,73 @@
-from .wecomsan import WecomSan
-from .models import WecomApiRespBase, WecomApiRespUploadTempMedia
-from .errors import SUCCESS, WecomSanUploadError, WecomSanRespError
+"""Names below are imported from their modules on first access, so `import wecomsan`
+doesn't load pydantic, urllib3 or asyncio until something needs them.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .wecomsan import WecomSan, MessageTemplate
+    from .models import (
+        WecomApiRespBase, WecomApiRespUploadTempMedia, WecomApiRespGetToken, WecomApiRespMessage, WecomBulkResult,
+        WecomApiRespLite, parse_errcode,
+    )
+    from .errors import (
+        SUCCESS, TOKEN_INVALID_ERRCODES, RATE_LIMIT_ERRCODES, TRANSIENT_ERRCODES,
+        WecomSanUploadError, WecomSanRespError, WecomSanLocalError, WecomSanTimeoutError, WecomSanQueueFullError,
+        WecomSanRateLimitError,
+    )
+    from .tokenstore import TokenStore, CachedToken, MemoryTokenStore, FileTokenStore, SqliteTokenStore
+    from .mediacache import MediaCache, CachedMedia, MemoryMediaCache, SqliteMediaCache
+    from .ratelimit import Rate, RateLimiter
+    from .retry import RetryPolicy
+    from .codec import JsonCodec, StdlibCodec, OrjsonCodec, MsgspecCodec, default_codec
+    from .aio import AsyncWecomSan
+    from .dispatcher import WecomSanDispatcher
+    from .coalescer import MessageCoalescer
+    from .outbox import SqliteOutbox
+    from .transport import WecomTransport
+
+_EXPORTS = {
+    'wecomsan': ('WecomSan', 'MessageTemplate'),
+    'models': (
+        'WecomApiRespBase', 'WecomApiRespUploadTempMedia', 'WecomApiRespGetToken', 'WecomApiRespMessage',
+        'WecomBulkResult', 'WecomApiRespLite', 'parse_errcode',
+    ),
+    'errors': (
+        'SUCCESS', 'TOKEN_INVALID_ERRCODES', 'RATE_LIMIT_ERRCODES', 'TRANSIENT_ERRCODES',
+        'WecomSanUploadError', 'WecomSanRespError', 'WecomSanLocalError', 'WecomSanTimeoutError',
+        'WecomSanQueueFullError', 'WecomSanRateLimitError',
+    ),
+    'tokenstore': ('TokenStore', 'CachedToken', 'MemoryTokenStore', 'FileTokenStore', 'SqliteTokenStore'),
+    'mediacache': ('MediaCache', 'CachedMedia', 'MemoryMediaCache', 'SqliteMediaCache'),
+    'ratelimit': ('Rate', 'RateLimiter'),
+    'retry': ('RetryPolicy',),
+    'codec': ('JsonCodec', 'StdlibCodec', 'OrjsonCodec', 'MsgspecCodec', 'default_codec'),
+    'aio': ('AsyncWecomSan',),
+    'dispatcher': ('WecomSanDispatcher',),
+    'coalescer': ('MessageCoalescer',),
+    'outbox': ('SqliteOutbox',),
+    'transport': ('WecomTransport',),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None and not name.startswith('__'):
+        # submodules, e.g. `wecomsan.errors`, as when they were imported eagerly
+        try:
+            return importlib.import_module(f'{__name__}.{name}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,371 @@
+"""asyncio client with the same surface as `WecomSan`.
+
+Runs on non-blocking sockets through a small keep-alive HTTP/1.1 connection
+pool to qyapi.weixin.qq.com, so one event loop can have thousands of sends
+in flight without a thread pool.
+"""
+import asyncio
+import collections
+import ssl
+import time
+from typing import BinaryIO, Deque, Dict, Optional, Tuple, Union, TextIO
+from urllib.parse import urlencode
+
+from wecomsan.codec import JsonCodec, default_codec
+from wecomsan.errors import SUCCESS, TOKEN_INVALID_ERRCODES, WecomSanRespError
+from wecomsan.media import MediaContent, Base64Reader, is_base64, open_media
+from wecomsan.models import WecomApiRespBase, WecomApiRespUploadTempMedia, WecomApiRespGetToken, MediaType, MediaId
+from wecomsan.myrequests.models import RequestEncodingMixin, StreamingMultipartBody
+from wecomsan.tokenstore import TokenStore, MemoryTokenStore, CachedToken, token_key
+from wecomsan.wecomsan import build_message, check_upload, split_text
+
+API_HOST = 'qyapi.weixin.qq.com'
+API_PREFIX = '/cgi-bin/'
+
+_Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections to a single host.
+
+    At most `maxsize` requests are in flight at once, the others wait for a free slot.
+    A request failing on a reused connection that the server closed while idle is
+    sent again once on a new connection. Streamed upload bodies are read in the
+    loop's default executor.
+    """
+
+    def __init__(self, host: str, port: int = 443, ssl_context: Union[ssl.SSLContext, bool, None] = True,
+                 maxsize: int = 100, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        if ssl_context is True:
+            ssl_context = ssl.create_default_context()
+        self.ssl_context = ssl_context or None
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle: Deque[_Connection] = collections.deque()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _open(self) -> _Connection:
+        return await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl_context,
+            server_hostname=self.host if self.ssl_context else None,
+        )
+
+    async def request(self, method: str, target: str, headers: Optional[Dict[str, str]] = None,
+                      body: Union[bytes, StreamingMultipartBody] = b'') -> Tuple[int, bytes]:
+        """Returns (status, body). `body` may also be a sized iterable of bytes chunks that can be iterated again."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.maxsize)
+        async with self._semaphore:
+            return await asyncio.wait_for(self._request(method, target, headers or {}, body), self.timeout)
+
+    async def _request(self, method: str, target: str, headers: Dict[str, str],
+                       body: Union[bytes, StreamingMultipartBody]) -> Tuple[int, bytes]:
+        head = [f'{method} {target} HTTP/1.1', f'Host: {self.host}', f'Content-Length: {len(body)}',
+                'Accept-Encoding: identity', 'Connection: keep-alive']
+        head.extend(f'{k}: {v}' for k, v in headers.items())
+        data = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1')
+        if isinstance(body, (bytes, bytearray)):
+            data += body
+            body = None
+
+        while True:
+            reused = False
+            while self._idle:
+                reader, writer = self._idle.pop()
+                if not writer.is_closing() and not reader.at_eof():
+                    reused = True
+                    break
+                writer.close()
+            if not reused:
+                reader, writer = await self._open()
+
+            try:
+                writer.write(data)
+                if body is not None:
+                    # file reads and base64 decoding block, keep them off the loop
+                    loop = asyncio.get_running_loop()
+                    chunks = iter(body)
+                    while True:
+                        chunk = await loop.run_in_executor(None, next, chunks, None)
+                        if chunk is None:
+                            break
+                        writer.write(chunk)
+                        await writer.drain()
+                await writer.drain()
+                status, keep_alive, content = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, content
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool, bytes]:
+    """Returns (status, keep_alive, body)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed by server')
+    version, status = status_line.split(None, 2)[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == b'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                # skip trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        content = b''.join(chunks)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        keep_alive = False
+    return int(status), keep_alive, content
+
+
+class AsyncWecomSan:
+    def __init__(self, cid, aid, secret, *, token_refresh_margin=300, token_store: Optional[TokenStore] = None,
+                 pool_maxsize=100, timeout: Optional[float] = None, verify: Union[ssl.SSLContext, bool] = True,
+                 codec: Optional[JsonCodec] = None):
+        """See `WecomSan`. `token_store` is read and written but its lock is not taken,
+        since it would block the event loop; refreshes are coalesced within the loop only.
+
+        `pool_maxsize` caps concurrent requests, `timeout` applies to each request as a whole.
+        Proxies are not supported.
+        """
+        self.cid = cid
+        self.aid = aid
+        self.secret = secret
+        self.token_refresh_margin = token_refresh_margin
+        self.token_store = token_store if token_store is not None else MemoryTokenStore()
+        self.codec = codec if codec is not None else default_codec()
+        self.pool = AsyncConnectionPool(API_HOST, ssl_context=verify, maxsize=pool_maxsize, timeout=timeout)
+        self._token_key = token_key(cid, secret)
+        self._token: Optional[CachedToken] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    async def close(self):
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _is_fresh(self, token: Optional[CachedToken]) -> bool:
+        return token is not None and time.time() < token.expires_at - self.token_refresh_margin
+
+    async def get_access_token(self) -> str:
+        """Cached access token, fetched again once it is within `token_refresh_margin` of expiring."""
+        token = self._token
+        if self._is_fresh(token):
+            return token.access_token
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            token = self._token
+            if not self._is_fresh(token):
+                token = self.token_store.get(self._token_key)
+                if not self._is_fresh(token):
+                    token = await self._get_token()
+                    self.token_store.set(self._token_key, token)
+                self._token = token
+        return token.access_token
+
+    async def _get_token(self) -> CachedToken:
+        requested_at = time.time()
+        query = urlencode({'corpid': self.cid, 'corpsecret': self.secret})
+        _, content = await self.pool.request('GET', f'{API_PREFIX}gettoken?{query}')
+        respModel = self.codec.decode(WecomApiRespGetToken, content)
+        if respModel.errcode != SUCCESS or not respModel.access_token:
+            raise ModuleNotFoundError('fail to get access token')
+        return CachedToken(respModel.access_token, requested_at + respModel.expires_in, respModel.expires_in)
+
+    def invalidate_token(self, access_token: Optional[str] = None):
+        """See `WecomSan.invalidate_token`."""
+        token = self._token
+        if access_token is None and token is not None:
+            access_token = token.access_token
+        if token is not None and token.access_token == access_token:
+            self._token = None
+        if access_token is not None:
+            self.token_store.delete(self._token_key, access_token)
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       body: Union[bytes, StreamingMultipartBody] = b'') -> bytes:
+        """See `WecomSan._request`."""
+        params = dict(params or {})
+        access_token = await self.get_access_token()
+        target = f'{API_PREFIX}{path}?{urlencode({**params, "access_token": access_token})}'
+        _, content = await self.pool.request(method, target, headers, body)
+        try:
+            errcode = self.codec.decode(WecomApiRespBase, content).errcode
+        except ValueError:
+            return content
+        if errcode not in TOKEN_INVALID_ERRCODES:
+            return content
+
+        self.invalidate_token(access_token)
+        access_token = await self.get_access_token()
+        target = f'{API_PREFIX}{path}?{urlencode({**params, "access_token": access_token})}'
+        _, content = await self.pool.request(method, target, headers, body)
+        return content
+
+    async def _send_message(self, data: dict) -> WecomApiRespBase:
+        content = await self._request('POST', 'message/send', body=self.codec.dumps(data))
+        respModel = self.codec.decode(WecomApiRespBase, content)
+        if respModel.errcode != SUCCESS:
+            raise WecomSanRespError(respModel.errcode, respModel.errmsg)
+        return respModel
+
+    async def _upload(self, media_type: MediaType, files: dict) -> bytes:
+        body, content_type = RequestEncodingMixin._encode_files(files, None)
+        return await self._request(
+            'POST', 'media/upload', params={'type': media_type}, headers={'Content-Type': content_type}, body=body
+        )
+
+    async def send(self, text, touid='@all') -> WecomApiRespBase:
+        """See `WecomSan.send`."""
+        data = build_message(self.aid, touid, "text", {
+            "content": text
+        })
+        return await self._send_message(data)
+
+    async def send_autosplit2(self, text, touid='@all', max_content_bytes=2048) -> list[WecomApiRespBase]:
+        """split text into `max_content_bytes` chunks before sending."""
+        resps = []
+        for chunk in split_text(text, max_content_bytes):
+            resps.append(await self.send(chunk, touid))
+        return resps
+
+    async def send_image(self, content: MediaContent, touid='@all',
+                         filename: Optional[str] = None) -> Optional[WecomApiRespBase]:
+        """See `WecomSan.send_image`."""
+        if isinstance(content, (bytes, bytearray, memoryview)) and is_base64(content):
+            content = Base64Reader(content)
+        try:
+            media_id = await self._upload_media('image', content, filename, None, base64_str=True)
+        except WecomSanRespError:
+            return None
+
+        data = build_message(self.aid, touid, "image", {
+            "media_id": media_id
+        })
+        return await self._send_message(data)
+
+    async def send_file(self, content: MediaContent, touid='@all', filename: Optional[str] = None,
+                        content_type: Optional[str] = None) -> WecomApiRespBase:
+        """See `WecomSan.send_file`."""
+        media_id = await self._upload_media('file', content, filename, content_type)
+        data = build_message(self.aid, touid, "file", {
+            "media_id": media_id
+        })
+        return await self._send_message(data)
+
+    async def send_video(self, content: MediaContent, touid='@all', title: Optional[str] = None,
+                         description: Optional[str] = None, filename: Optional[str] = None) -> WecomApiRespBase:
+        """See `WecomSan.send_video`."""
+        media_id = await self._upload_media('video', content, filename, 'video/mp4')
+        video = {"media_id": media_id}
+        if title is not None:
+            video["title"] = title
+        if description is not None:
+            video["description"] = description
+        data = build_message(self.aid, touid, "video", video)
+        return await self._send_message(data)
+
+    async def send_voice(self, content: MediaContent, touid='@all', filename: Optional[str] = None) -> WecomApiRespBase:
+        """See `WecomSan.send_voice`."""
+        media_id = await self._upload_media('voice', content, filename, 'audio/amr')
+        data = build_message(self.aid, touid, "voice", {
+            "media_id": media_id
+        })
+        return await self._send_message(data)
+
+    async def _upload_media(self, media_type: MediaType, content: MediaContent, filename: Optional[str],
+                            content_type: Optional[str], base64_str=False) -> MediaId:
+        with open_media(content, base64_str) as (fp, filelength, name):
+            respModel = await self.upload_temp_media(filename or name or media_type, fp, filelength, content_type,
+                                                     media_type)
+        return respModel.media_id
+
+    async def send_markdown(self, text, touid='@all') -> WecomApiRespBase:
+        """See `WecomSan.send_markdown`."""
+        data = build_message(self.aid, touid, "markdown", {
+            "content": text
+        })
+        return await self._send_message(data)
+
+    async def send_textcard(self, title, description, url, btntxt='详情', touid='@all') -> WecomApiRespBase:
+        """See `WecomSan.send_textcard`."""
+        data = build_message(self.aid, touid, "textcard", {
+            "title": title,
+            "description": description,
+            "url": url,
+            "btntxt": btntxt,
+        })
+        return await self._send_message(data)
+
+    async def upload_temp_media(
+        self,
+        filename: str,
+        content: Union[str, bytes, bytearray, memoryview, TextIO, BinaryIO],
+        filelength: int,
+        content_type: Optional[str],
+        media_type: MediaType,
+    ) -> WecomApiRespUploadTempMedia:
+        """See `WecomSan.upload_temp_media`.
+
+        Raises:
+            `WecomSanUploadError`, `WecomSanRespError`
+        """
+        check_upload(filelength, media_type)
+
+        files = {
+            'media': (filename, content, content_type, dict(filelength=filelength))
+        }
+        content = await self._upload(media_type, files)
+        respModel = self.codec.decode(WecomApiRespBase, content)
+        if respModel.errcode == SUCCESS:
+            return self.codec.decode(WecomApiRespUploadTempMedia, content)
+        raise WecomSanRespError(respModel.errcode, respModel.errmsg)
+
+    async def get_temp_media_url(self, media_id: MediaId) -> str:
+        """See `WecomSan.get_temp_media_url`."""
+        return f'https://{API_HOST}{API_PREFIX}media/get?access_token={await self.get_access_token()}&media_id={media_id}'
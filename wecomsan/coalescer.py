@@ -0,0 +1,161 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from wecomsan.errors import WecomSanLocalError
+from wecomsan.models import WecomApiRespBase
+from wecomsan.wecomsan import WecomSan, split_text
+
+# content limits of message/send, see: https://developer.work.weixin.qq.com/document/path/90236
+MAX_CONTENT_BYTES = {'text': 2048, 'markdown': 2048}
+
+
+class _Buffer:
+    __slots__ = ('deadline', 'texts', 'futures', 'nbytes')
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.texts: List[str] = []
+        self.futures: List[Future] = []
+        self.nbytes = 0
+
+
+def pack_texts(texts: List[str], max_bytes: int, separator: str = '\n') -> List[Tuple[str, List[int]]]:
+    """Join `texts` into as few contents of at most `max_bytes` UTF-8 bytes as possible, keeping their order.
+
+    Returns (content, indices of the texts in it). A text longer than
+    `max_bytes` is split by `split_text` into contents of its own.
+    """
+    sep_len = len(separator.encode('utf-8'))
+    packed = []
+    parts: List[str] = []
+    indices: List[int] = []
+    size = 0
+    for i, text in enumerate(texts):
+        n = len(text.encode('utf-8'))
+        if parts and size + sep_len + n > max_bytes:
+            packed.append((separator.join(parts), indices))
+            parts, indices, size = [], [], 0
+        if n > max_bytes:
+            packed.extend((chunk, [i]) for chunk in split_text(text, max_bytes))
+            continue
+        size += n + sep_len if parts else n
+        parts.append(text)
+        indices.append(i)
+    if parts:
+        packed.append((separator.join(parts), indices))
+    return packed
+
+
+class MessageCoalescer:
+    """Merge texts sent through `client` to the same touid within `window` seconds.
+
+    The first text to a (touid, msgtype) opens a window; everything sent there
+    until it closes goes out joined by `separator`, in as few messages as fit
+    under the content limit of the msgtype. A window closes early once
+    `max_bytes` are buffered. Each text's `Future` resolves to the response of
+    the (last) message carrying it. Messages are sent from a background thread.
+    """
+
+    def __init__(self, client: WecomSan, window: float = 1.0, max_bytes: Optional[int] = None,
+                 separator: str = '\n'):
+        self.client = client
+        self.window = window
+        self.max_bytes = max_bytes
+        self.separator = separator
+        self._buffers: Dict[Tuple[str, str], _Buffer] = {}
+        self._cond = threading.Condition()
+        self._sending = 0
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='wecomsan-coalescer', daemon=True)
+        self._flusher.start()
+
+    def send(self, text, touid='@all') -> 'Future[WecomApiRespBase]':
+        """See `WecomSan.send`."""
+        return self._add('text', text, touid)
+
+    def send_markdown(self, text, touid='@all') -> 'Future[WecomApiRespBase]':
+        """See `WecomSan.send_markdown`."""
+        return self._add('markdown', text, touid)
+
+    def _add(self, msgtype: str, text: str, touid: str) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise WecomSanLocalError('coalescer is closed')
+            buffer = self._buffers.get((touid, msgtype))
+            if buffer is None:
+                buffer = self._buffers[(touid, msgtype)] = _Buffer(time.monotonic() + self.window)
+                self._cond.notify()
+            buffer.texts.append(text)
+            buffer.futures.append(future)
+            buffer.nbytes += len(text.encode('utf-8'))
+            if buffer.nbytes >= (self.max_bytes or MAX_CONTENT_BYTES[msgtype]):
+                buffer.deadline = 0.0
+                self._cond.notify()
+        return future
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, buffer in self._buffers.items() if buffer.deadline <= now]
+                    if due or (self._closed and not self._buffers):
+                        break
+                    timeout = min((b.deadline for b in self._buffers.values()), default=now + 60) - now
+                    self._cond.wait(timeout)
+                if not due:
+                    return
+                buffers = [(key, self._buffers.pop(key)) for key in due]
+                self._sending += 1
+
+            try:
+                for (touid, msgtype), buffer in buffers:
+                    self._send_buffer(touid, msgtype, buffer)
+            finally:
+                with self._cond:
+                    self._sending -= 1
+                    self._cond.notify_all()
+
+    def _send_buffer(self, touid: str, msgtype: str, buffer: _Buffer):
+        send = self.client.send if msgtype == 'text' else self.client.send_markdown
+        results: List[Optional[Tuple[bool, object]]] = [None] * len(buffer.texts)
+        for content, indices in pack_texts(buffer.texts, MAX_CONTENT_BYTES[msgtype], self.separator):
+            try:
+                result = (True, send(content, touid))
+            except Exception as e:
+                result = (False, e)
+            for i in indices:
+                # a failed part of a split text fails the whole text
+                if results[i] is None or results[i][0]:
+                    results[i] = result
+        for future, (ok, value) in zip(buffer.futures, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def flush(self):
+        """Send everything buffered so far right away and wait for it."""
+        with self._cond:
+            for buffer in self._buffers.values():
+                buffer.deadline = 0.0
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._buffers and not self._sending)
+
+    def close(self):
+        """Stop accepting texts and send the buffered ones."""
+        with self._cond:
+            self._closed = True
+        self.flush()
+        with self._cond:
+            self._cond.notify_all()
+        self._flusher.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
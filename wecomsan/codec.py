@@ -0,0 +1,98 @@
+"""JSON encoding of request bodies and decoding of API responses.
+
+`default_codec` picks orjson or msgspec when installed and falls back to the
+standard library otherwise.
+"""
+import json
+from typing import TYPE_CHECKING, Any, Optional, Type, TypeVar
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+M = TypeVar('M', bound='BaseModel')
+
+
+class JsonCodec:
+    """Base of the codecs. `dumps` returns UTF-8 encoded JSON, `loads` raises `ValueError` on invalid JSON."""
+
+    name = ''
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def decode(self, model: Type[M], data: bytes) -> M:
+        """Parse a response body into `model`."""
+        return model.model_validate(self.loads(data))
+
+
+class StdlibCodec(JsonCodec):
+    """`json` of the standard library, encoding exactly like `json.dumps`."""
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        # WeCom only sends UTF-8, skip json's detection of UTF-16/32
+        return json.loads(data.decode('utf-8'))
+
+    def decode(self, model: Type[M], data: bytes) -> M:
+        # pydantic's own parser beats json.loads followed by validation
+        return model.model_validate_json(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = 'msgspec'
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+_default: Optional[JsonCodec] = None
+
+
+def default_codec() -> JsonCodec:
+    """The fastest codec available, shared by all clients."""
+    global _default
+    if _default is None:
+        if orjson is not None:
+            _default = OrjsonCodec()
+        elif msgspec is not None:
+            _default = MsgspecCodec()
+        else:
+            _default = StdlibCodec()
+    return _default
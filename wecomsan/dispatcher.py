@@ -0,0 +1,112 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from wecomsan.errors import WecomSanLocalError, WecomSanQueueFullError
+from wecomsan.models import WecomApiRespBase
+from wecomsan.wecomsan import WecomSan
+
+_STOP = object()
+
+
+class WecomSanDispatcher:
+    """Send through `client` from `workers` background threads.
+
+    The `*_async` methods put the call on a queue of at most `maxsize` entries and
+    return a `Future` right away; they raise `WecomSanQueueFullError` instead of
+    blocking when the queue is full. The workers share the client's connection
+    pool, so give the client a `pool_maxsize` of at least `workers`.
+    """
+
+    def __init__(self, client: WecomSan, workers: int = 4, maxsize: int = 1000):
+        self.client = client
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f'wecomsan-dispatcher-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Call `fn(*args, **kwargs)` on a worker thread."""
+        future = Future()
+        # checked together with the count, so close() waits for this call once it got past
+        with self._idle:
+            if self._closed:
+                raise WecomSanLocalError('dispatcher is closed')
+            self._pending += 1
+        try:
+            self._queue.put_nowait((future, fn, args, kwargs))
+        except queue.Full:
+            self._done()
+            raise WecomSanQueueFullError(f'{self._queue.maxsize} messages are already queued')
+        return future
+
+    def send_async(self, text, touid='@all') -> 'Future[WecomApiRespBase]':
+        return self.submit(self.client.send, text, touid)
+
+    def send_markdown_async(self, text, touid='@all') -> 'Future[WecomApiRespBase]':
+        return self.submit(self.client.send_markdown, text, touid)
+
+    def send_textcard_async(self, title, description, url, btntxt='详情', touid='@all') -> 'Future[WecomApiRespBase]':
+        return self.submit(self.client.send_textcard, title, description, url, btntxt, touid)
+
+    def send_image_async(self, content, touid='@all') -> 'Future[Optional[WecomApiRespBase]]':
+        return self.submit(self.client.send_image, content, touid)
+
+    def _done(self):
+        with self._idle:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future, fn, args, kwargs = item
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                self._done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far has been sent. Returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting messages, wait for the queued ones and stop the workers.
+
+        Returns False if the queue was not drained within `timeout`; the workers
+        then finish it in the background.
+        """
+        with self._idle:
+            self._closed = True
+        if not self.flush(timeout):
+            threading.Thread(target=self._stop_workers, daemon=True).start()
+            return False
+        self._stop_workers()
+        return True
+
+    def _stop_workers(self):
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,5 +1,19 @@
 # https://developer.work.weixin.qq.com/document/path/90313
 SUCCESS = 0
+SYSTEM_BUSY = -1
+INVALID_CREDENTIAL = 40001
+INVALID_ACCESS_TOKEN = 40014
+ACCESS_TOKEN_EXPIRED = 42001
+
+API_FREQ_LIMIT = 45009
+API_CONCURRENCY_LIMIT = 45033
+
+# the access token has to be fetched again
+TOKEN_INVALID_ERRCODES = frozenset({INVALID_CREDENTIAL, INVALID_ACCESS_TOKEN, ACCESS_TOKEN_EXPIRED})
+# calls have to slow down
+RATE_LIMIT_ERRCODES = frozenset({API_FREQ_LIMIT, API_CONCURRENCY_LIMIT})
+# the same call may succeed later
+TRANSIENT_ERRCODES = frozenset({SYSTEM_BUSY}) | RATE_LIMIT_ERRCODES
 
 
 class WecomSanRespError(Exception):
@@ -17,3 +31,15 @@ class WecomSanLocalError(Exception):
 
 class WecomSanUploadError(WecomSanLocalError):
     ...
+
+
+class WecomSanTimeoutError(WecomSanLocalError):
+    ...
+
+
+class WecomSanQueueFullError(WecomSanLocalError):
+    ...
+
+
+class WecomSanRateLimitError(WecomSanLocalError):
+    ...
@@ -0,0 +1,138 @@
+"""Media content accepted by the senders, turned into something the multipart body can stream."""
+import base64
+import contextlib
+import io
+import os
+import re
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from wecomsan.myrequests.utils import super_len
+
+MediaContent = Union[bytes, bytearray, memoryview, str, os.PathLike, BinaryIO]
+
+_BASE64_WHITESPACE = ' \t\r\n'
+_STR_WHITESPACE_TABLE = str.maketrans('', '', _BASE64_WHITESPACE)
+_BYTES_WHITESPACE = _BASE64_WHITESPACE.encode('ascii')
+_BASE64_BYTES = re.compile(rb'[A-Za-z0-9+/=\s]*')
+
+
+class Base64Reader:
+    """Binary file object decoding base64 `data` chunk by chunk as it is read.
+
+    Whitespace is skipped like `base64.b64decode` does, so the decoded content
+    is never held in memory as a whole. Can only be rewound to the start.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    """Encoded characters decoded per step, a multiple of 4"""
+
+    mode = 'rb'
+
+    def __init__(self, data: Union[str, bytes, bytearray, memoryview]):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        self._data = data
+        self.len = _decoded_len(data)
+        self.seek(0)
+
+    def __len__(self):
+        return self.len
+
+    def _decode_step(self) -> bytes:
+        piece = self._data[self._offset:self._offset + self.CHUNK_SIZE]
+        self._offset += self.CHUNK_SIZE
+        if isinstance(piece, str):
+            piece = piece.translate(_STR_WHITESPACE_TABLE)
+        else:
+            piece = bytes(piece).translate(None, _BYTES_WHITESPACE)
+        piece = self._pending + piece
+        if self._offset >= len(self._data):
+            # the last step decodes everything left, raising on bad padding like b64decode
+            self._pending = piece[:0]
+            return base64.b64decode(piece)
+        cut = len(piece) // 4 * 4
+        self._pending = piece[cut:]
+        return base64.b64decode(piece[:cut])
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        while (size is None or size < 0 or len(self._buffer) < size) and self._offset < len(self._data):
+            self._buffer += self._decode_step()
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self._position
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if (offset, whence) != (0, io.SEEK_SET):
+            raise io.UnsupportedOperation('Base64Reader can only be rewound to the start')
+        self._offset = 0
+        self._pending = self._data[:0] if isinstance(self._data, str) else b''
+        self._buffer = bytearray()
+        self._position = 0
+        return 0
+
+
+def _decoded_len(data: Union[str, bytes, bytearray]) -> int:
+    if isinstance(data, str):
+        whitespace, pad = _BASE64_WHITESPACE, '='
+    else:
+        whitespace, pad = _BYTES_WHITESPACE, b'='
+    n = len(data) - sum(data.count(whitespace[i:i + 1]) for i in range(len(whitespace)))
+    padding = data[-64:].rstrip(whitespace)[-2:].count(pad)
+    return n // 4 * 3 - padding
+
+
+def is_base64(data: Union[bytes, bytearray, memoryview]) -> bool:
+    """Whether `data` only consists of base64 characters, which raw image or media bytes never do."""
+    return _BASE64_BYTES.fullmatch(data) is not None
+
+
+def is_seekable(fp) -> bool:
+    """Whether file object `fp` can be rewound, unlike pipes and sockets."""
+    try:
+        return fp.seekable() if hasattr(fp, 'seekable') else hasattr(fp, 'seek') and hasattr(fp, 'tell')
+    except (OSError, ValueError):
+        return False
+
+
+@contextlib.contextmanager
+def open_media(
+    content: MediaContent, base64_str=False,
+) -> Iterator[Tuple[Union[bytes, bytearray, memoryview, BinaryIO], int, Optional[str]]]:
+    """Yield (content, length, filename) to upload `content` without copying it.
+
+    `content` may be bytes-like, a path, or a binary file object read from its
+    current position; unseekable ones like pipes are read into memory. A `str`
+    is a path, or base64 encoded content if `base64_str`. Files opened from a
+    path are closed on exit. `filename` is None if it can't be told from `content`.
+    """
+    if isinstance(content, str) and base64_str:
+        reader = Base64Reader(content)
+        yield reader, len(reader), None
+    elif isinstance(content, (bytes, bytearray)):
+        yield content, len(content), None
+    elif isinstance(content, memoryview):
+        content = content.cast('B')
+        yield content, content.nbytes, None
+    elif isinstance(content, (str, os.PathLike)):
+        with open(content, 'rb') as f:
+            yield f, super_len(f), os.path.basename(os.fspath(content))
+    elif hasattr(content, 'read'):
+        name = getattr(content, 'name', None)
+        filename = os.path.basename(name) if isinstance(name, str) else None
+        if is_seekable(content):
+            yield content, super_len(content), filename
+        else:
+            # the length of pipes and sockets is only known once read
+            data = content.read()
+            yield data, len(data), filename
+    else:
+        raise TypeError(f'unsupported media content: {type(content).__name__}')
@@ -0,0 +1,138 @@
+"""Caches of uploaded temp media, so sending the same content again reuses its media_id.
+
+Entries are keyed by a hash of the content together with the corp id, media
+type and file name, since a media_id is only valid in the corp that uploaded
+it. They are dropped `max_age` seconds after upload, before WeCom expires
+the media_id after 3 days.
+"""
+import collections
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional, Protocol, Union, TextIO
+
+MEDIA_EXPIRES_IN = 3 * 24 * 3600
+# keep a margin so a cached media_id is never sent right as it expires
+DEFAULT_MAX_AGE = MEDIA_EXPIRES_IN - 3600
+
+
+class CachedMedia(NamedTuple):
+    media_id: str
+    media_type: str
+    created_at: float
+    """Unix timestamp"""
+
+
+def media_key(cid: str, content: Union[str, bytes, bytearray, memoryview, TextIO], media_type: str,
+              filename: str) -> str:
+    """Cache key of `content` uploaded by corp `cid`.
+
+    File objects are hashed from their current position and rewound afterwards.
+    """
+    h = hashlib.sha256()
+    if hasattr(content, 'read'):
+        position = content.tell()
+        while True:
+            chunk = content.read(64 * 1024)
+            if not chunk:
+                break
+            h.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        content.seek(position)
+    else:
+        h.update(content.encode('utf-8') if isinstance(content, str) else content)
+    return f'{cid}:{media_type}:{filename}:{h.hexdigest()}'
+
+
+class MediaCache(Protocol):
+    def get(self, key: str) -> Optional[CachedMedia]:
+        ...
+
+    def set(self, key: str, media: CachedMedia) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryMediaCache:
+    """LRU cache of at most `maxsize` entries in this process."""
+
+    def __init__(self, maxsize: int = 1024, max_age: float = DEFAULT_MAX_AGE):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._entries: collections.OrderedDict[str, CachedMedia] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedMedia]:
+        with self._lock:
+            media = self._entries.get(key)
+            if media is None:
+                return None
+            if time.time() >= media.created_at + self.max_age:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return media
+
+    def set(self, key: str, media: CachedMedia) -> None:
+        with self._lock:
+            self._entries[key] = media
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteMediaCache:
+    """Entries in a SQLite database in WAL mode, shared between processes and restarts."""
+
+    def __init__(self, path: str, max_age: float = DEFAULT_MAX_AGE, timeout: float = 30):
+        self.path = path
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS media ('
+            'key TEXT PRIMARY KEY, media_id TEXT NOT NULL, media_type TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self.purge()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedMedia]:
+        row = self._conn().execute(
+            'SELECT media_id, media_type, created_at FROM media WHERE key = ? AND created_at > ?',
+            (key, time.time() - self.max_age),
+        ).fetchone()
+        return CachedMedia(*row) if row else None
+
+    def set(self, key: str, media: CachedMedia) -> None:
+        self._conn().execute(
+            'INSERT OR REPLACE INTO media (key, media_id, media_type, created_at) VALUES (?, ?, ?, ?)',
+            (key, *media),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute('DELETE FROM media WHERE key = ?', (key,))
+
+    def purge(self) -> None:
+        """Delete expired entries."""
+        self._conn().execute('DELETE FROM media WHERE created_at <= ?', (time.time() - self.max_age,))
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
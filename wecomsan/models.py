@@ -1,5 +1,7 @@
+import dataclasses
 import datetime
-from typing import Literal, TypeVar
+import re
+from typing import Any, Generic, List, Literal, Optional, Type, TypeVar
 
 from pydantic import BaseModel
 
@@ -10,6 +12,22 @@ class WecomApiRespBase(BaseModel):
     errmsg: str
 
 
+class WecomApiRespMessage(WecomApiRespBase):
+    """https://developer.work.weixin.qq.com/document/path/90236"""
+    invaliduser: str = ''
+    invalidparty: str = ''
+    invalidtag: str = ''
+    unlicenseduser: str = ''
+    msgid: str = ''
+    response_code: str = ''
+
+
+class WecomApiRespGetToken(WecomApiRespBase):
+    """https://developer.work.weixin.qq.com/document/path/91039"""
+    access_token: str = ''
+    expires_in: int = 0
+
+
 MediaType = Literal['image', 'voice', 'video', 'file']
 MediaId = TypeVar('MediaId', bound=str)
 
@@ -19,3 +37,87 @@ class WecomApiRespUploadTempMedia(WecomApiRespBase):
     type: MediaType
     media_id: MediaId
     created_at: datetime.datetime
+
+
+M = TypeVar('M', bound=WecomApiRespBase)
+
+# WeCom answers with errcode as the first key, the compact form is tried first
+_ERRCODE_COMPACT = re.compile(rb'\{"errcode":(-?\d+)[,}]')
+_ERRCODE = re.compile(rb'\s*\{\s*"errcode"\s*:\s*(-?\d+)\s*[,}]')
+_MSGID = re.compile(rb'"msgid"\s*:\s*"([^"\\]*)"')
+
+
+def parse_errcode(content: bytes) -> Optional[int]:
+    """errcode of a response body, read off the raw bytes; None if it doesn't start with one."""
+    match = _ERRCODE_COMPACT.match(content) or _ERRCODE.match(content)
+    return int(match.group(1)) if match else None
+
+
+class WecomApiRespLite(Generic[M]):
+    """Response whose errcode is read off the raw bytes, without validation.
+
+    Any other field builds the full `model` on first access, e.g. `resp.errmsg`
+    or `resp.media_id`, except `msgid` which is read off the bytes too.
+    """
+
+    __slots__ = ('errcode', 'content', 'model_cls', '_model', '_codec')
+
+    def __init__(self, errcode: int, content: bytes, model_cls: Type[M], codec, model: Optional[M] = None):
+        self.errcode = errcode
+        self.content = content
+        self.model_cls = model_cls
+        self._codec = codec
+        self._model = model
+
+    @classmethod
+    def parse(cls, content: bytes, model_cls: Type[M], codec) -> 'WecomApiRespLite[M]':
+        """`codec` decodes the full model, see `wecomsan.codec.JsonCodec`.
+
+        Bodies not starting with an errcode are decoded in full right away.
+        """
+        errcode = parse_errcode(content)
+        if errcode is None:
+            model = codec.decode(model_cls, content)
+            return cls(model.errcode, content, model_cls, codec, model)
+        return cls(errcode, content, model_cls, codec)
+
+    @property
+    def model(self) -> M:
+        if self._model is None:
+            self._model = self._codec.decode(self.model_cls, self.content)
+        return self._model
+
+    @property
+    def msgid(self) -> str:
+        content = self.content
+        start = content.find(b'"msgid":"')
+        if start >= 0:
+            start += 9
+            end = content.find(b'"', start)
+            if end >= 0 and content[end - 1:end] != b'\\':
+                return content[start:end].decode('utf-8')
+        match = _MSGID.search(content)
+        return match.group(1).decode('utf-8') if match else getattr(self.model, 'msgid')
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(errcode={self.errcode}, model_cls={self.model_cls.__name__})'
+
+
+@dataclasses.dataclass
+class WecomBulkResult:
+    """Outcome of `WecomSan.send_bulk` over all of its calls."""
+    responses: List[WecomApiRespMessage] = dataclasses.field(default_factory=list)
+    invaliduser: List[str] = dataclasses.field(default_factory=list)
+    unlicenseduser: List[str] = dataclasses.field(default_factory=list)
+    failed_userids: List[str] = dataclasses.field(default_factory=list)
+    """Recipients of calls that raised, see `errors`"""
+    errors: List[Exception] = dataclasses.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -44,18 +44,13 @@ import urllib3
 
 from .exceptions import RequestsDependencyWarning
 
-try:
-    from charset_normalizer import __version__ as charset_normalizer_version
-except ImportError:
-    charset_normalizer_version = None
 
-try:
-    from chardet import __version__ as chardet_version
-except ImportError:
-    chardet_version = None
+def check_compatibility(urllib3_version, chardet_version, charset_normalizer_version):
+    _check_urllib3_version(urllib3_version)
+    _check_charset_versions(chardet_version, charset_normalizer_version)
 
 
-def check_compatibility(urllib3_version, chardet_version, charset_normalizer_version):
+def _check_urllib3_version(urllib3_version):
     urllib3_version = urllib3_version.split(".")
     assert urllib3_version != ["dev"]  # Verify urllib3 isn't installed from git.
 
@@ -71,6 +66,8 @@ def check_compatibility(urllib3_version, chardet_version, charset_normalizer_ver
     if major == 1:
         assert minor >= 21
 
+
+def _check_charset_versions(chardet_version, charset_normalizer_version):
     # Check charset_normalizer for compatibility.
     if chardet_version:
         major, minor, patch = chardet_version.split(".")[:3]
@@ -100,17 +97,29 @@ def _check_cryptography(cryptography_version):
         warnings.warn(warning, RequestsDependencyWarning)
 
 
+def _check_charset_compatibility(detector):
+    # Called by compat once the detector is imported, which only happens
+    # when the encoding of a response has to be guessed.
+    if detector.__name__ == "chardet":
+        chardet_version, charset_normalizer_version = detector.__version__, None
+    else:
+        chardet_version, charset_normalizer_version = None, detector.__version__
+    try:
+        _check_charset_versions(chardet_version, charset_normalizer_version)
+    except (AssertionError, ValueError):
+        warnings.warn(
+            "chardet ({})/charset_normalizer ({}) doesn't match a supported "
+            "version!".format(chardet_version, charset_normalizer_version),
+            RequestsDependencyWarning,
+        )
+
+
 # Check imported dependencies for compatibility.
 try:
-    check_compatibility(
-        urllib3.__version__, chardet_version, charset_normalizer_version
-    )
+    _check_urllib3_version(urllib3.__version__)
 except (AssertionError, ValueError):
     warnings.warn(
-        "urllib3 ({}) or chardet ({})/charset_normalizer ({}) doesn't match a supported "
-        "version!".format(
-            urllib3.__version__, chardet_version, charset_normalizer_version
-        ),
+        "urllib3 ({}) doesn't match a supported version!".format(urllib3.__version__),
         RequestsDependencyWarning,
     )
 
@@ -144,7 +153,7 @@ warnings.simplefilter("ignore", DependencyWarning)
 import logging
 from logging import NullHandler
 
-from . import packages, utils
+from . import utils
 from .__version__ import (
     __author__,
     __author_email__,
@@ -178,3 +187,12 @@ logging.getLogger(__name__).addHandler(NullHandler())
 
 # FileModeWarnings go off per the default.
 warnings.simplefilter("default", FileModeWarning, append=True)
+
+
+def __getattr__(name):
+    # `packages` imports idna and the charset detector, only load it when asked for
+    if name == "packages":
+        import importlib
+
+        return importlib.import_module(f"{__name__}.packages")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,6 +8,8 @@ and maintain connections.
 
 import os.path
 import socket  # noqa: F401
+import ssl
+import threading
 
 from urllib3.exceptions import ClosedPoolError, ConnectTimeoutError
 from urllib3.exceptions import HTTPError as _HTTPError
@@ -25,7 +27,9 @@ from urllib3.poolmanager import PoolManager, proxy_from_url
 from urllib3.util import Timeout as TimeoutSauce
 from urllib3.util import parse_url
 from urllib3.util.retry import Retry
+from urllib3.util.ssl_ import create_urllib3_context
 
+from . import utils
 from .auth import _basic_auth_str
 from .compat import basestring, urlparse
 from .cookies import extract_cookies_to_jar
@@ -44,7 +48,6 @@ from .exceptions import (
 from .models import Response
 from .structures import CaseInsensitiveDict
 from .utils import (
-    DEFAULT_CA_BUNDLE_PATH,
     extract_zipped_paths,
     get_auth_from_url,
     get_encoding_from_headers,
@@ -66,6 +69,79 @@ DEFAULT_POOLSIZE = 10
 DEFAULT_RETRIES = 0
 DEFAULT_POOL_TIMEOUT = None
 
+#: Most servers a :class:`ResumingSSLContext` keeps a TLS session for.
+MAX_TLS_SESSIONS = 64
+
+
+class SessionSavingSSLSocket(ssl.SSLSocket):
+    """SSLSocket handing its TLS session back to its context after the
+    handshake and again on close, when TLS 1.3 tickets have arrived."""
+
+    def do_handshake(self, *args, **kwargs):
+        super().do_handshake(*args, **kwargs)
+        self.context.save_session(self)
+
+    def close(self):
+        self.context.save_session(self)
+        super().close()
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """SSLContext offering the last TLS session of a server to the next
+    connection to it, so reconnects use an abbreviated handshake."""
+
+    sslsocket_class = SessionSavingSSLSocket
+
+    @classmethod
+    def from_urllib3_defaults(cls, cert_reqs):
+        """A context set up like ``urllib3.util.ssl_.create_urllib3_context``
+        does, except that session tickets are allowed."""
+        defaults = create_urllib3_context(cert_reqs=cert_reqs)
+        context = cls(ssl.PROTOCOL_TLS_CLIENT)
+        context.minimum_version = defaults.minimum_version
+        context.maximum_version = defaults.maximum_version
+        context.options = defaults.options & ~ssl.OP_NO_TICKET
+        context.verify_flags = defaults.verify_flags
+        if getattr(defaults, "post_handshake_auth", None) is not None:
+            context.post_handshake_auth = defaults.post_handshake_auth
+        context.check_hostname = defaults.check_hostname
+        context.verify_mode = defaults.verify_mode
+        return context
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    def save_session(self, sock):
+        hostname = sock.server_hostname
+        try:
+            session = sock.session
+        except (AttributeError, ValueError):
+            return
+        if session is None or hostname is None:
+            return
+        if not session.has_ticket and sock.version() == "TLSv1.3":
+            # TLS 1.3 tickets come after the handshake, there is nothing to resume yet
+            return
+        with self._sessions_lock:
+            if hostname not in self._sessions and len(self._sessions) >= MAX_TLS_SESSIONS:
+                self._sessions.pop(next(iter(self._sessions)))
+            self._sessions[hostname] = session
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True,
+                    suppress_ragged_eofs=True, server_hostname=None, session=None):
+        if session is None and not server_side and server_hostname is not None:
+            session = self._sessions.get(server_hostname)
+        return super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
 
 class BaseAdapter:
     """The Base Transport Adapter"""
@@ -145,6 +221,7 @@ class HTTPAdapter(BaseAdapter):
             self.max_retries = Retry.from_int(max_retries)
         self.config = {}
         self.proxy_manager = {}
+        self._ssl_contexts = {}
 
         super().__init__()
 
@@ -162,6 +239,7 @@ class HTTPAdapter(BaseAdapter):
         # self.poolmanager uses a lambda function, which isn't pickleable.
         self.proxy_manager = {}
         self.config = {}
+        self._ssl_contexts = {}
 
         for attr, value in state.items():
             setattr(self, attr, value)
@@ -246,8 +324,50 @@ class HTTPAdapter(BaseAdapter):
             to a CA bundle to use
         :param cert: The SSL certificate to verify.
         """
-        if url.lower().startswith("https") and verify:
+        # Certificates are loaded once into a shared SSLContext, see
+        # ssl_context_for; the pool must not load them again per connection.
+        conn.ca_certs = None
+        conn.ca_cert_dir = None
+        conn.cert_file = None
+        conn.key_file = None
+
+        if url.lower().startswith("https"):
+            conn.cert_reqs = "CERT_REQUIRED" if verify else "CERT_NONE"
+            conn.conn_kw["ssl_context"] = self.ssl_context_for(verify, cert)
+        else:
+            conn.cert_reqs = "CERT_NONE"
 
+    def ssl_context_for(self, verify, cert):
+        """Return the :class:`ResumingSSLContext` for a ``verify`` and ``cert``
+        setting, building it on first use. Connections sharing a context
+        resume each other's TLS sessions.
+
+        :param verify: Either a boolean, in which case it controls whether we verify
+            the server's TLS certificate, or a string, in which case it must be a path
+            to a CA bundle to use
+        :param cert: The SSL certificate to verify.
+        :rtype: ssl.SSLContext
+        """
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert)
+        context = self._ssl_contexts.get(key)
+        if context is None:
+            context = self._ssl_contexts.setdefault(
+                key, self.build_ssl_context(verify, cert)
+            )
+        return context
+
+    def build_ssl_context(self, verify, cert):
+        """Build an SSLContext with urllib3's defaults. This method should not
+        be called from user code, and is only exposed for use when subclassing
+        the :class:`HTTPAdapter <requests.adapters.HTTPAdapter>`.
+
+        :rtype: ssl.SSLContext
+        """
+        context = ResumingSSLContext.from_urllib3_defaults(
+            ssl.CERT_REQUIRED if verify else ssl.CERT_NONE
+        )
+
+        if verify:
             cert_loc = None
 
             # Allow self-specified cert location.
@@ -255,7 +375,7 @@ class HTTPAdapter(BaseAdapter):
                 cert_loc = verify
 
             if not cert_loc:
-                cert_loc = extract_zipped_paths(DEFAULT_CA_BUNDLE_PATH)
+                cert_loc = extract_zipped_paths(utils.DEFAULT_CA_BUNDLE_PATH)
 
             if not cert_loc or not os.path.exists(cert_loc):
                 raise OSError(
@@ -263,33 +383,29 @@ class HTTPAdapter(BaseAdapter):
                     f"invalid path: {cert_loc}"
                 )
 
-            conn.cert_reqs = "CERT_REQUIRED"
-
             if not os.path.isdir(cert_loc):
-                conn.ca_certs = cert_loc
+                context.load_verify_locations(cafile=cert_loc)
             else:
-                conn.ca_cert_dir = cert_loc
-        else:
-            conn.cert_reqs = "CERT_NONE"
-            conn.ca_certs = None
-            conn.ca_cert_dir = None
+                context.load_verify_locations(capath=cert_loc)
 
         if cert:
             if not isinstance(cert, basestring):
-                conn.cert_file = cert[0]
-                conn.key_file = cert[1]
+                cert_file, key_file = cert[0], cert[1]
             else:
-                conn.cert_file = cert
-                conn.key_file = None
-            if conn.cert_file and not os.path.exists(conn.cert_file):
+                cert_file, key_file = cert, None
+            if cert_file and not os.path.exists(cert_file):
                 raise OSError(
                     f"Could not find the TLS certificate file, "
-                    f"invalid path: {conn.cert_file}"
+                    f"invalid path: {cert_file}"
                 )
-            if conn.key_file and not os.path.exists(conn.key_file):
+            if key_file and not os.path.exists(key_file):
                 raise OSError(
-                    f"Could not find the TLS key file, invalid path: {conn.key_file}"
+                    f"Could not find the TLS key file, invalid path: {key_file}"
                 )
+            if cert_file:
+                context.load_cert_chain(cert_file, key_file)
+
+        return context
 
     def build_response(self, req, resp):
         """Builds a :class:`Response <requests.Response>` object from a urllib3
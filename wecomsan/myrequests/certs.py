@@ -11,7 +11,14 @@ If you are packaging Requests, e.g., for a Linux distribution or a managed
 environment, you can change the definition of where() to return a separately
 packaged CA bundle.
 """
-from certifi import where
+
+
+def where():
+    # certifi is imported on first use, it pulls in importlib.resources
+    from certifi import where
+
+    return where()
+
 
 if __name__ == "__main__":
     print(where())
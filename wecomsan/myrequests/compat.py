@@ -7,13 +7,30 @@ between Python 2 and Python 3. It remains for backwards
 compatibility until the next major version.
 """
 
-try:
-    import chardet
-except ImportError:
-    import charset_normalizer as chardet
-
 import sys
 
+
+def __getattr__(name):
+    # chardet/charset_normalizer is only needed to guess the encoding of a
+    # response, so it is imported the first time `compat.chardet` is used
+    if name == "chardet":
+        global chardet
+        try:
+            import chardet
+        except ImportError:
+            import warnings
+
+            import charset_normalizer as chardet
+
+            warnings.filterwarnings(
+                "ignore", "Trying to detect", module="charset_normalizer"
+            )
+        from . import _check_charset_compatibility
+
+        _check_charset_compatibility(chardet)
+        return chardet
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # -------
 # Pythons
 # -------
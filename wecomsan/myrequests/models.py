@@ -11,6 +11,7 @@ import datetime
 # Implicit import within threads may cause LookupError when standard library is in a ZIP,
 # such as in Embedded Python. See https://github.com/psf/requests/issues/3578.
 import encodings.idna  # noqa: F401
+import io
 from io import UnsupportedOperation
 
 from urllib3.exceptions import (
@@ -21,10 +22,11 @@ from urllib3.exceptions import (
     SSLError,
 )
 from urllib3.fields import RequestField
-from urllib3.filepost import encode_multipart_formdata
+from urllib3.filepost import choose_boundary, iter_field_objects
 from urllib3.util import parse_url
 
 from ._internal_utils import to_native_string, unicode_is_ascii
+from . import compat
 from .auth import HTTPBasicAuth
 from .compat import (
     Callable,
@@ -32,7 +34,6 @@ from .compat import (
     Mapping,
     basestring,
     builtin_str,
-    chardet,
     cookielib,
 )
 from .compat import json as complexjson
@@ -188,7 +189,8 @@ class RequestEncodingMixin:
             if isinstance(fp, (str, bytes, bytearray)):
                 fdata = fp
             elif hasattr(fp, "read"):
-                fdata = fp.read()
+                # binary files of known size are streamed by StreamingMultipartBody
+                fdata = fp if _is_streamable(fp) else fp.read()
             elif fp is None:
                 continue
             else:
@@ -203,11 +205,109 @@ class RequestEncodingMixin:
                 rf.headers["Content-Disposition"] += "; filelength={}".format(filelength)
             new_fields.append(rf)
 
-        body, content_type = encode_multipart_formdata(new_fields)
+        boundary = choose_boundary()
+        parts = []
+        for field in iter_field_objects(new_fields):
+            parts.append(
+                f"--{boundary}\r\n".encode("latin-1")
+                + field.render_headers().encode("utf-8")
+            )
+            data = field.data
+            if isinstance(data, int):
+                data = str(data)
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            parts.append(data)
+            parts.append(b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode("latin-1"))
+
+        body = StreamingMultipartBody(parts)
+        content_type = f"multipart/form-data; boundary={boundary}"
 
         return body, content_type
 
 
+def _is_streamable(fp):
+    """Whether a file object can be sent as-is: binary, seekable and of known size."""
+    if isinstance(fp, io.TextIOBase) or "b" not in getattr(fp, "mode", "b"):
+        return False
+    if not (hasattr(fp, "seek") and hasattr(fp, "tell")):
+        return False
+    try:
+        return fp.seekable() if hasattr(fp, "seekable") else True
+    except (OSError, ValueError):
+        return False
+
+
+class StreamingMultipartBody:
+    """A multipart/form-data body that reads file parts chunk by chunk.
+
+    ``parts`` are bytes-like objects or binary seekable file objects. File objects are read
+    from their position at construction time, so the whole body has a known
+    length and is sent with a Content-Length header while only one chunk of
+    each file is held in memory. ``seek(0)`` rewinds the body so it can be sent
+    again.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, parts):
+        self._parts = []
+        for part in parts:
+            if hasattr(part, "read"):
+                self._parts.append((part, part.tell(), super_len(part)))
+            else:
+                self._parts.append((part, 0, memoryview(part).nbytes))
+        self.len = sum(length for _, _, length in self._parts)
+        self._chunks = None
+        self._buffer = b""
+        self._position = 0
+
+    def __len__(self):
+        return self.len
+
+    def __iter__(self):
+        for part, start, length in self._parts:
+            if not hasattr(part, "read"):
+                yield part
+                continue
+            part.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = part.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError("file ended before its announced length while uploading")
+                remaining -= len(chunk)
+                yield chunk
+
+    def read(self, size=-1):
+        if self._chunks is None:
+            self._chunks = iter(self)
+        if size is None or size < 0:
+            data = self._buffer + b"".join(self._chunks)
+            self._buffer = b""
+        else:
+            while len(self._buffer) < size:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer += chunk
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if (offset, whence) != (0, io.SEEK_SET):
+            raise UnsupportedOperation("StreamingMultipartBody can only be rewound to the start")
+        self._chunks = None
+        self._buffer = b""
+        self._position = 0
+        return 0
+
+
 class RequestHooksMixin:
     def register_hook(self, event, hook):
         """Properly register a hook."""
@@ -795,7 +895,7 @@ class Response:
     @property
     def apparent_encoding(self):
         """The apparent encoding, provided by the charset_normalizer or chardet libraries."""
-        return chardet.detect(self.content)["encoding"]
+        return compat.chardet.detect(self.content)["encoding"]
 
     def iter_content(self, chunk_size=1, decode_unicode=False):
         """Iterates over the response data.  When stream=True is set on the
@@ -57,6 +57,32 @@ if sys.platform == "win32":
 else:
     preferred_clock = time.time
 
+#: Environment variables that proxy, CA bundle and netrc resolution depend on.
+ENVIRONMENT_KEYS = tuple(
+    name
+    for scheme in ("http", "https", "all", "no")
+    for name in (f"{scheme}_proxy", f"{scheme.upper()}_PROXY")
+) + ("REQUESTS_CA_BUNDLE", "CURL_CA_BUNDLE", "NETRC", "HOME")
+
+#: Most (scheme, host) entries a session keeps resolved.
+ENVIRONMENT_CACHE_SIZE = 256
+
+
+try:
+    # os.environ.get goes through a KeyError for each unset name, which makes
+    # it the bulk of a snapshot; its backing dict can be read directly
+    _environ_data = os.environ._data
+    _ENCODED_ENVIRONMENT_KEYS = tuple(map(os.environ.encodekey, ENVIRONMENT_KEYS))
+except AttributeError:
+    _environ_data = None
+
+
+def _environment_snapshot():
+    if _environ_data is not None:
+        return tuple(map(_environ_data.get, _ENCODED_ENVIRONMENT_KEYS))
+    get = os.environ.get
+    return tuple([get(name) for name in ENVIRONMENT_KEYS])
+
 
 def merge_setting(request_setting, session_setting, dict_class=OrderedDict):
     """Determines appropriate setting for a given request, taking into account
@@ -450,6 +476,8 @@ class Session(SessionRedirectMixin):
         self.mount("https://", HTTPAdapter())
         self.mount("http://", HTTPAdapter())
 
+        self.clear_environment_cache()
+
     def __enter__(self):
         return self
 
@@ -480,7 +508,7 @@ class Session(SessionRedirectMixin):
         # Set environment's basic authentication if not explicitly set.
         auth = request.auth
         if self.trust_env and not auth and not self.auth:
-            auth = get_netrc_auth(request.url)
+            auth = self._environment_settings(request.url, None)[2]
 
         p = PreparedRequest()
         p.prepare(
@@ -758,18 +786,14 @@ class Session(SessionRedirectMixin):
         if self.trust_env:
             # Set environment's proxies.
             no_proxy = proxies.get("no_proxy") if proxies is not None else None
-            env_proxies = get_environ_proxies(url, no_proxy=no_proxy)
+            env_proxies, env_verify, _ = self._environment_settings(url, no_proxy)
             for (k, v) in env_proxies.items():
                 proxies.setdefault(k, v)
 
             # Look for requests environment configuration
             # and be compatible with cURL.
             if verify is True or verify is None:
-                verify = (
-                    os.environ.get("REQUESTS_CA_BUNDLE")
-                    or os.environ.get("CURL_CA_BUNDLE")
-                    or verify
-                )
+                verify = env_verify or verify
 
         # Merge all the kwargs.
         proxies = merge_setting(proxies, self.proxies)
@@ -779,6 +803,40 @@ class Session(SessionRedirectMixin):
 
         return {"proxies": proxies, "stream": stream, "verify": verify, "cert": cert}
 
+    def _environment_settings(self, url, no_proxy):
+        """Environment proxies, CA bundle and netrc auth for ``url``.
+
+        Resolved once per (scheme, host, no_proxy) and reused until one of
+        :data:`ENVIRONMENT_KEYS` changes. Changes to other proxy settings,
+        e.g. the system ones on macOS and Windows, or to the netrc file
+        itself are picked up after :meth:`clear_environment_cache`.
+
+        :rtype: tuple
+        """
+        snapshot = _environment_snapshot()
+        if snapshot != self._environment_snapshot:
+            self.clear_environment_cache()
+            self._environment_snapshot = snapshot
+
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc, no_proxy)
+        settings = self._environment_cache.get(key)
+        if settings is None:
+            settings = (
+                get_environ_proxies(url, no_proxy=no_proxy),
+                os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE"),
+                get_netrc_auth(url),
+            )
+            if len(self._environment_cache) >= ENVIRONMENT_CACHE_SIZE:
+                self._environment_cache.clear()
+            self._environment_cache[key] = settings
+        return settings
+
+    def clear_environment_cache(self):
+        """Resolve environment settings again on the next request."""
+        self._environment_cache = {}
+        self._environment_snapshot = None
+
     def get_adapter(self, url):
         """
         Returns the appropriate connection adapter for the given URL.
@@ -816,6 +874,7 @@ class Session(SessionRedirectMixin):
     def __setstate__(self, state):
         for attr, value in state.items():
             setattr(self, attr, value)
+        self.clear_environment_cache()
 
 
 def session():
@@ -60,7 +60,15 @@ from .structures import CaseInsensitiveDict
 
 NETRC_FILES = (".netrc", "_netrc")
 
-DEFAULT_CA_BUNDLE_PATH = certs.where()
+
+def __getattr__(name):
+    # resolved on first use, see certs.where
+    if name == "DEFAULT_CA_BUNDLE_PATH":
+        global DEFAULT_CA_BUNDLE_PATH
+        DEFAULT_CA_BUNDLE_PATH = certs.where()
+        return DEFAULT_CA_BUNDLE_PATH
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 DEFAULT_PORTS = {"http": 80, "https": 443}
 
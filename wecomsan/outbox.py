@@ -0,0 +1,255 @@
+"""Persistent outbox: messages are written to SQLite before they are sent.
+
+Rows are deleted once WeCom has answered them, so messages still in flight
+when the process dies are sent again by the next `SqliteOutbox` on the same
+file. Use one file per process: an outbox sends every row it finds on start.
+"""
+import heapq
+import json
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from wecomsan.errors import WecomSanLocalError, WecomSanRespError
+from wecomsan.models import WecomApiRespBase
+from wecomsan.wecomsan import WecomSan, build_message
+
+_STOP = object()
+
+
+class _Entry:
+    __slots__ = ('data', 'future', 'committed', 'id', 'attempts', 'error')
+
+    def __init__(self, data: dict, future: Optional[Future]):
+        self.data = data
+        self.future = future
+        self.committed = threading.Event()
+        self.id: Optional[int] = None
+        self.attempts = 0
+        self.error: Optional[BaseException] = None
+
+
+class SqliteOutbox:
+    """Send messages through `client` from a SQLite (WAL mode) outbox at `path`.
+
+    Enqueueing threads hand their rows to a single writer thread, which commits
+    everything that arrived meanwhile in one transaction (group commit), so one
+    fsync covers a whole batch. Rows of answered messages are deleted in the same
+    batched transactions. `workers` threads send committed rows in order of arrival.
+
+    Sends failing without an answer from WeCom, e.g. on a `ConnectionError`, are
+    retried after `backoff` seconds, doubling up to `max_backoff`, until WeCom
+    answers. Their futures only fail if they are still unanswered on `close()`;
+    the rows stay for the next outbox on the file.
+
+    Rows left over by a previous process are sent on start, so every process
+    needs its own file. Messages are stored with `enable_duplicate_check`, so a
+    message that did reach WeCom before the crash is dropped as a duplicate
+    within `duplicate_check_interval`.
+
+    Only messages that don't need an upload can be queued.
+    """
+
+    def __init__(self, client: WecomSan, path: str, workers: int = 4, max_batch: int = 1000,
+                 backoff: float = 1.0, max_backoff: float = 60.0):
+        self.client = client
+        self.path = path
+        self.max_batch = max_batch
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._inserts: List[_Entry] = []
+        self._deletes: List[int] = []
+        self._retries: List[Tuple[float, int, _Entry]] = []
+        """heap of (due time, row id, entry)"""
+        self._cond = threading.Condition()
+        self._sendq: queue.Queue = queue.Queue()
+        self._closed = False
+        self._stopping = False
+        self._drained = threading.Event()
+        self._finish = False
+
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        for row_id, data in self._conn.execute('SELECT id, data FROM outbox ORDER BY id').fetchall():
+            entry = _Entry(json.loads(data), None)
+            entry.id = row_id
+            entry.committed.set()
+            self._sendq.put(entry)
+
+        self._writer = threading.Thread(target=self._write_loop, name='wecomsan-outbox-writer', daemon=True)
+        self._writer.start()
+        self._workers = [
+            threading.Thread(target=self._send_loop, name=f'wecomsan-outbox-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def enqueue(self, data: dict, wait_durable: bool = True) -> 'Future[WecomApiRespBase]':
+        """Queue a message/send body. With `wait_durable`, returns once it is committed to disk."""
+        data.setdefault('enable_duplicate_check', 1)
+        entry = _Entry(data, Future())
+        # checked together with the append, so close() drains this entry once it got past
+        with self._cond:
+            if self._closed:
+                raise WecomSanLocalError('outbox is closed')
+            self._inserts.append(entry)
+            self._cond.notify()
+        if wait_durable:
+            entry.committed.wait()
+        return entry.future
+
+    def send(self, text, touid='@all', wait_durable=True) -> 'Future[WecomApiRespBase]':
+        """See `WecomSan.send`."""
+        return self.enqueue(build_message(self.client.aid, touid, "text", {
+            "content": text
+        }), wait_durable)
+
+    def send_markdown(self, text, touid='@all', wait_durable=True) -> 'Future[WecomApiRespBase]':
+        """See `WecomSan.send_markdown`."""
+        return self.enqueue(build_message(self.client.aid, touid, "markdown", {
+            "content": text
+        }), wait_durable)
+
+    def send_textcard(self, title, description, url, btntxt='详情', touid='@all',
+                      wait_durable=True) -> 'Future[WecomApiRespBase]':
+        """See `WecomSan.send_textcard`."""
+        return self.enqueue(build_message(self.client.aid, touid, "textcard", {
+            "title": title,
+            "description": description,
+            "url": url,
+            "btntxt": btntxt,
+        }), wait_durable)
+
+    def pending(self) -> int:
+        """Number of messages not answered yet, including those of previous processes."""
+        with self._db_lock:
+            return self._conn.execute('SELECT COUNT(*) FROM outbox').fetchone()[0] + len(self._inserts)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    while self._retries and not self._stopping and self._retries[0][0] <= now:
+                        self._sendq.put(heapq.heappop(self._retries)[2])
+                    if (self._inserts or self._deletes or self._finish
+                            or (self._closed and not self._drained.is_set())):
+                        break
+                    self._cond.wait(self._retries[0][0] - now if self._retries and not self._stopping else None)
+                inserts, self._inserts = self._inserts[:self.max_batch], self._inserts[self.max_batch:]
+                deletes, self._deletes = self._deletes, []
+                finish = self._finish
+
+            if inserts or deletes:
+                try:
+                    self._commit(inserts, deletes)
+                except Exception as e:
+                    # the rows are not durable, fail their senders instead of sending
+                    for entry in inserts:
+                        entry.future.set_exception(e)
+                        entry.committed.set()
+                    inserts = []
+                    with self._cond:
+                        self._deletes.extend(deletes)
+                    if finish:
+                        return
+                    time.sleep(1)
+                    continue
+
+            for entry in inserts:
+                entry.committed.set()
+                self._sendq.put(entry)
+            with self._cond:
+                if self._closed and not self._inserts:
+                    self._drained.set()
+            if finish:
+                return
+
+    def _commit(self, inserts: List[_Entry], deletes: List[int]):
+        now = time.time()
+        rows = [json.dumps(entry.data) for entry in inserts]
+        conn = self._conn
+        with self._db_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                ids = [
+                    conn.execute('INSERT INTO outbox (data, created_at) VALUES (?, ?)', (row, now)).lastrowid
+                    for row in rows
+                ]
+                conn.executemany('DELETE FROM outbox WHERE id = ?', ((row_id,) for row_id in deletes))
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        for entry, row_id in zip(inserts, ids):
+            entry.id = row_id
+
+    def _send_loop(self):
+        while True:
+            entry = self._sendq.get()
+            if entry is _STOP:
+                return
+            resp, error = None, None
+            try:
+                resp = self.client._send_message(entry.data)
+            except WecomSanRespError as e:
+                # WeCom answered, sending it again won't help
+                error = e
+            except Exception as e:
+                # not answered, send it again later
+                entry.attempts += 1
+                entry.error = e
+                delay = min(self.max_backoff, self.backoff * 2 ** (entry.attempts - 1))
+                with self._cond:
+                    heapq.heappush(self._retries, (time.monotonic() + delay, entry.id, entry))
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._deletes.append(entry.id)
+                self._cond.notify()
+            if entry.future is not None:
+                if error is None:
+                    entry.future.set_result(resp)
+                else:
+                    entry.future.set_exception(error)
+
+    def close(self):
+        """Stop accepting messages, send the queued ones and commit their removal.
+
+        Messages waiting for a retry are not sent again; their futures fail with
+        the last error and they stay in the outbox.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._drained.wait()
+        with self._cond:
+            self._stopping = True
+        for _ in self._workers:
+            self._sendq.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        with self._cond:
+            retries, self._retries = self._retries, []
+            self._finish = True
+            self._cond.notify()
+        for _, _, entry in retries:
+            if entry.future is not None:
+                entry.future.set_exception(entry.error)
+        self._writer.join()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
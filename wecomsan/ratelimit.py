@@ -0,0 +1,142 @@
+"""Client-side token buckets smoothing bursts under WeCom's frequency limits.
+
+See: https://developer.work.weixin.qq.com/document/path/90312
+"""
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+from wecomsan.errors import SUCCESS, RATE_LIMIT_ERRCODES, WecomSanRateLimitError
+
+
+class Rate(NamedTuple):
+    calls: float
+    period: float
+    """seconds"""
+
+
+class _Bucket:
+    __slots__ = ('rate', 'tokens', 'updated')
+
+    def __init__(self, rate: Rate, now: float):
+        self.rate = rate
+        self.tokens = float(rate.calls)
+        self.updated = now
+
+    def refill(self, now: float, scale: float):
+        self.tokens = min(self.rate.calls, self.tokens + (now - self.updated) * self.rate.calls / self.rate.period * scale)
+        self.updated = now
+
+    def wait_time(self, scale: float) -> float:
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.rate.period / (self.rate.calls * scale)
+
+
+class RateLimiter:
+    """Token buckets per app (corpid, agentid), per recipient and per corp (corpid).
+
+    A budget of None is unlimited. Share one limiter between clients of the
+    same corp to enforce `per_corp` across them.
+
+    With `block`, `acquire` sleeps until every bucket has a token, or raises
+    `WecomSanRateLimitError` if that would take longer than `max_wait` seconds.
+    Without it, it raises right away.
+
+    Errcodes 45009/45033 from WeCom are taken as backpressure: all rates are
+    halved (down to `min_scale` of the configured ones) and sending pauses for
+    `backoff` seconds, doubling on repeated hits. Each success recovers
+    `recover` of the configured rates.
+    """
+
+    def __init__(
+        self,
+        per_app: Optional[Rate] = None,
+        per_recipient: Optional[Rate] = Rate(30, 60),
+        per_corp: Optional[Rate] = None,
+        block: bool = True,
+        max_wait: Optional[float] = None,
+        min_scale: float = 0.1,
+        recover: float = 0.05,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.per_app = per_app
+        self.per_recipient = per_recipient
+        self.per_corp = per_corp
+        self.block = block
+        self.max_wait = max_wait
+        self.min_scale = min_scale
+        self.recover = recover
+        self.initial_backoff = backoff
+        self.max_backoff = max_backoff
+        self.scale = 1.0
+        self._backoff = backoff
+        self._paused_until = 0.0
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._acquired = 0
+
+    def _bucket_keys(self, cid, aid, recipients: Iterable[str]) -> List[tuple]:
+        keys = []
+        if self.per_corp is not None:
+            keys.append(('corp', cid, self.per_corp))
+        if self.per_app is not None:
+            keys.append(('app', (cid, aid), self.per_app))
+        if self.per_recipient is not None:
+            keys.extend(('recipient', (cid, aid, r), self.per_recipient) for r in recipients)
+        return keys
+
+    def _buckets_for(self, keys: List[tuple], now: float) -> List[_Bucket]:
+        buckets = []
+        for kind, key, rate in keys:
+            bucket = self._buckets.get((kind, key))
+            if bucket is None:
+                bucket = self._buckets[(kind, key)] = _Bucket(rate, now)
+            else:
+                bucket.refill(now, self.scale)
+            buckets.append(bucket)
+        return buckets
+
+    def acquire(self, cid, aid, recipients: Iterable[str]):
+        """Take a token for one message from `aid` of `cid` to `recipients`.
+
+        Raises:
+            `WecomSanRateLimitError`
+        """
+        keys = self._bucket_keys(cid, aid, recipients)
+        deadline = None if self.max_wait is None else time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = self._buckets_for(keys, now)
+                wait = max([self._paused_until - now] + [b.wait_time(self.scale) for b in buckets])
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.tokens -= 1
+                    self._acquired += 1
+                    if self._acquired % 1024 == 0:
+                        self._purge(now)
+                    return
+
+            if not self.block or (deadline is not None and now + wait > deadline):
+                raise WecomSanRateLimitError(f'rate limited, next slot in {wait:.3f}s')
+            time.sleep(wait)
+
+    def feedback(self, errcode: int):
+        """Adapt the rates to the errcode WeCom answered a message with."""
+        with self._lock:
+            if errcode in RATE_LIMIT_ERRCODES:
+                self.scale = max(self.min_scale, self.scale / 2)
+                self._paused_until = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+            elif errcode == SUCCESS:
+                self.scale = min(1.0, self.scale + self.recover)
+                self._backoff = self.initial_backoff
+
+    def _purge(self, now: float):
+        # full buckets behave like new ones, drop them so per-recipient buckets don't pile up
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now, self.scale)
+            if bucket.tokens >= bucket.rate.calls:
+                del self._buckets[key]
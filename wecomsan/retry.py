@@ -0,0 +1,58 @@
+import random
+import time
+from typing import Collection, Optional, Tuple, Type
+
+from wecomsan.errors import TRANSIENT_ERRCODES
+from wecomsan.myrequests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+
+
+class RetryPolicy:
+    """When and how long to wait before calling the API again.
+
+    Calls answered with an errcode in `retry_errcodes`, or failing with one of
+    `retry_exceptions`, are retried up to `max_attempts` calls in total. The
+    delay doubles from `backoff` up to `max_backoff`, reduced by a random
+    fraction of up to `jitter`. No retry is started that would sleep past
+    `deadline` seconds after the first call.
+
+    A message may have reached WeCom even if its call timed out, so `WecomSan`
+    turns on `enable_duplicate_check` for messages when a policy is set, and
+    replays within `duplicate_check_interval` are dropped by WeCom.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        jitter: float = 0.5,
+        deadline: Optional[float] = 30.0,
+        retry_errcodes: Collection[int] = TRANSIENT_ERRCODES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError, Timeout, ChunkedEncodingError),
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_errcodes = frozenset(retry_errcodes)
+        self.retry_exceptions = retry_exceptions
+
+    def next_delay(self, attempt: int, started: float, errcode: Optional[int] = None,
+                   exc: Optional[BaseException] = None) -> Optional[float]:
+        """Seconds to wait before the call after `attempt` (1-based), or None to give up.
+
+        `started` is the `time.monotonic()` of the first call.
+        """
+        if exc is not None:
+            retryable = isinstance(exc, self.retry_exceptions)
+        else:
+            retryable = errcode in self.retry_errcodes
+        if not retryable or attempt >= self.max_attempts:
+            return None
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        delay *= 1 - random.uniform(0, self.jitter)
+        if self.deadline is not None and time.monotonic() + delay - started > self.deadline:
+            return None
+        return delay
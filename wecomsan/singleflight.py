@@ -0,0 +1,53 @@
+import threading
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+from wecomsan.errors import WecomSanTimeoutError
+
+T = TypeVar('T')
+
+
+class _Call(Generic[T]):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls with the same key into one.
+
+    The first caller runs `fn`, callers arriving while it is in flight wait for
+    and share its result (or exception) instead of running `fn` again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """Raises:
+            `WecomSanTimeoutError` if waiting on another caller takes longer than `timeout` seconds.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise WecomSanTimeoutError(f'timed out after {timeout}s waiting for in-flight call {key!r}')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,192 @@
+"""Access token stores shared by `WecomSan` instances.
+
+A store lets every process on a host reuse one access token instead of each
+calling gettoken on its own. `lock(key)` serializes refreshes so that only one
+holder fetches a new token while the others wait and then read it back.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from typing import ContextManager, Dict, NamedTuple, Optional, Protocol
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from wecomsan.errors import WecomSanLocalError
+
+
+class CachedToken(NamedTuple):
+    access_token: str
+    expires_at: float
+    """Unix timestamp"""
+    expires_in: int
+    """Lifetime in seconds as returned by gettoken"""
+
+
+def token_key(cid: str, secret: str) -> str:
+    """Store key of a (corpid, secret) pair. The secret is hashed so it never reaches the store."""
+    cid = re.sub(r'[^0-9A-Za-z_.-]', '_', str(cid))
+    return f"{cid}-{hashlib.sha256(str(secret).encode('utf-8')).hexdigest()[:16]}"
+
+
+class TokenStore(Protocol):
+    def get(self, key: str) -> Optional[CachedToken]:
+        ...
+
+    def set(self, key: str, token: CachedToken) -> None:
+        ...
+
+    def delete(self, key: str, access_token: Optional[str] = None) -> None:
+        """Delete the token under `key`. If `access_token` is given, only delete it if it is still the stored one."""
+        ...
+
+    def lock(self, key: str) -> ContextManager[None]:
+        """Exclusive lock held while refreshing the token under `key`."""
+        ...
+
+
+class MemoryTokenStore:
+    """Tokens kept in this process only."""
+
+    def __init__(self):
+        self._tokens: Dict[str, CachedToken] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._mutex = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedToken]:
+        return self._tokens.get(key)
+
+    def set(self, key: str, token: CachedToken) -> None:
+        self._tokens[key] = token
+
+    def delete(self, key: str, access_token: Optional[str] = None) -> None:
+        with self._mutex:
+            token = self._tokens.get(key)
+            if token is not None and (access_token is None or token.access_token == access_token):
+                del self._tokens[key]
+
+    def lock(self, key: str) -> ContextManager[None]:
+        with self._mutex:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+class FileTokenStore:
+    """One JSON file per key in `directory`, refreshes serialized with flock.
+
+    Writes go through a temp file and `os.replace`, so readers never see a partial token.
+    Not available on Windows.
+    """
+
+    def __init__(self, directory: str):
+        if fcntl is None:
+            raise WecomSanLocalError('FileTokenStore requires fcntl, which is not available on this platform')
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[CachedToken]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return CachedToken(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def set(self, key: str, token: CachedToken) -> None:
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{key}.', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(token._asdict(), f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str, access_token: Optional[str] = None) -> None:
+        if access_token is not None:
+            token = self.get(key)
+            if token is None or token.access_token != access_token:
+                return
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self._path(key))
+
+    @contextlib.contextmanager
+    def lock(self, key: str):
+        with open(os.path.join(self.directory, f'{key}.lock'), 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SqliteTokenStore:
+    """Tokens in a SQLite database in WAL mode, refreshes serialized with `BEGIN IMMEDIATE`."""
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tokens ('
+            'key TEXT PRIMARY KEY, access_token TEXT NOT NULL, expires_at REAL NOT NULL, expires_in INTEGER NOT NULL)'
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedToken]:
+        row = self._conn().execute(
+            'SELECT access_token, expires_at, expires_in FROM tokens WHERE key = ?', (key,)
+        ).fetchone()
+        return CachedToken(*row) if row else None
+
+    def set(self, key: str, token: CachedToken) -> None:
+        self._conn().execute(
+            'INSERT OR REPLACE INTO tokens (key, access_token, expires_at, expires_in) VALUES (?, ?, ?, ?)',
+            (key, *token),
+        )
+
+    def delete(self, key: str, access_token: Optional[str] = None) -> None:
+        if access_token is None:
+            self._conn().execute('DELETE FROM tokens WHERE key = ?', (key,))
+        else:
+            self._conn().execute('DELETE FROM tokens WHERE key = ? AND access_token = ?', (key, access_token))
+
+    @contextlib.contextmanager
+    def lock(self, key: str):
+        conn = self._conn()
+        if conn.in_transaction:
+            # already holding the lock in this thread
+            yield
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,124 @@
+"""Bare HTTP path for the JSON API.
+
+Prepared body bytes go straight to urllib3's `urlopen` and the response body
+comes back as bytes, skipping what `Session.send` does around it: cookie
+extraction, redirect resolution, hooks and merging settings per request.
+"""
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+from urllib3.exceptions import (
+    ClosedPoolError, ConnectTimeoutError, MaxRetryError, NewConnectionError, ProtocolError, ReadTimeoutError,
+)
+from urllib3.exceptions import ProxyError as _ProxyError
+from urllib3.exceptions import SSLError as _SSLError
+from urllib3.util import Timeout
+
+from wecomsan.myrequests.exceptions import ConnectionError, ConnectTimeout, ProxyError, ReadTimeout, SSLError
+from wecomsan.myrequests.sessions import Session, merge_setting
+from wecomsan.myrequests.structures import CaseInsensitiveDict
+from wecomsan.myrequests.utils import select_proxy
+
+
+class TransportRequest:
+    """Method, URL and body of one call; the URL is set again for each access token."""
+
+    __slots__ = ('method', 'url', 'body')
+
+    def __init__(self, method: str, body: Optional[bytes] = None):
+        self.method = method
+        self.url = ''
+        self.body = body
+
+    def prepare_url(self, url: str, params: dict):
+        self.url = f'{url}?{urlencode(params)}' if params else url
+
+
+class TransportResponse:
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class WecomTransport:
+    """Send `TransportRequest`s to `base_url` over the connection pools of `session`.
+
+    Proxies, CA bundle and headers are resolved once from `session` and the
+    arguments, like `Session.request` would; later changes to the environment
+    are not picked up. Cookies, auth and hooks are not supported, nor redirects.
+    Errors are raised as the `wecomsan.myrequests` exceptions `Session.send` raises.
+    """
+
+    def __init__(self, session: Session, base_url: str, *, timeout=None, proxies=None, verify=None, cert=None,
+                 headers=None):
+        settings = session.merge_environment_settings(base_url, dict(proxies or {}), None, verify, cert)
+        self.proxy = select_proxy(base_url, settings['proxies'])
+        self.verify = settings['verify']
+        self.cert = settings['cert']
+        self.headers = dict(merge_setting(headers, session.headers, dict_class=CaseInsensitiveDict))
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            self.timeout = Timeout(connect=connect, read=read)
+        elif isinstance(timeout, Timeout):
+            self.timeout = timeout
+        else:
+            self.timeout = Timeout(connect=timeout, read=timeout)
+
+        self.adapter = session.get_adapter(base_url)
+        parts = urlsplit(base_url)
+        self._origin = f'{parts.scheme}://{parts.netloc}'
+        self._host, self._port, self._scheme = parts.hostname, parts.port, parts.scheme
+        # absolute URLs are only sent to plain HTTP proxies, see HTTPAdapter.request_url
+        self._absolute_url = self.proxy is not None and parts.scheme == 'http'
+        self._verified_pool = None
+
+    def prepare(self, method: str, body=None) -> TransportRequest:
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return TransportRequest(method, body)
+
+    def _pool(self, url: str):
+        if self.proxy is None:
+            pool = self.adapter.poolmanager.connection_from_host(self._host, self._port, self._scheme)
+        else:
+            pool = self.adapter.get_connection(url, {self._scheme: self.proxy})
+        if pool is not self._verified_pool:
+            self.adapter.cert_verify(pool, url, self.verify, self.cert)
+            self._verified_pool = pool
+        return pool
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        url = request.url
+        try:
+            resp = self._pool(url).urlopen(
+                method=request.method,
+                url=url if self._absolute_url else url[len(self._origin):],
+                body=request.body,
+                headers=self.headers,
+                redirect=False,
+                assert_same_host=False,
+                preload_content=True,
+                decode_content=True,
+                retries=self.adapter.max_retries,
+                timeout=self.timeout,
+            )
+        except (ProtocolError, OSError, ClosedPoolError) as e:
+            raise ConnectionError(e)
+        except MaxRetryError as e:
+            if isinstance(e.reason, ConnectTimeoutError) and not isinstance(e.reason, NewConnectionError):
+                raise ConnectTimeout(e)
+            if isinstance(e.reason, _ProxyError):
+                raise ProxyError(e)
+            if isinstance(e.reason, _SSLError):
+                raise SSLError(e)
+            raise ConnectionError(e)
+        except _ProxyError as e:
+            raise ProxyError(e)
+        except _SSLError as e:
+            raise SSLError(e)
+        except ReadTimeoutError as e:
+            raise ReadTimeout(e)
+        return TransportResponse(resp.status, resp.headers, resp.data)
@@ -1,75 +1,531 @@
-import base64
+import functools
 import json
-from typing import Optional, Union, TextIO
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Optional, Tuple, Union, TextIO
 
 import wecomsan.myrequests as requests
 """Move filelength field from custom header to content-disposition"""
+from wecomsan.myrequests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
-from wecomsan.errors import SUCCESS, WecomSanUploadError, WecomSanRespError
-from wecomsan.models import WecomApiRespBase, WecomApiRespUploadTempMedia, MediaType, MediaId
+from wecomsan.codec import JsonCodec, default_codec
+from wecomsan.errors import SUCCESS, TOKEN_INVALID_ERRCODES, WecomSanUploadError, WecomSanRespError
+from wecomsan.ratelimit import RateLimiter
+from wecomsan.retry import RetryPolicy
+from wecomsan.singleflight import SingleFlight
+from wecomsan.media import MediaContent, Base64Reader, is_base64, is_seekable, open_media
+from wecomsan.mediacache import MediaCache, CachedMedia, media_key
+from wecomsan.transport import TransportRequest, WecomTransport
+from wecomsan.tokenstore import TokenStore, MemoryTokenStore, CachedToken, token_key
+from wecomsan.models import (
+    WecomApiRespBase, WecomApiRespUploadTempMedia, WecomApiRespGetToken, WecomApiRespMessage, WecomBulkResult,
+    WecomApiRespLite, MediaType, MediaId, parse_errcode,
+)
+
+logger = logging.getLogger(__name__)
+
+API_BASE = 'https://qyapi.weixin.qq.com/cgi-bin/'
+# most userids message/send takes in one touser
+MAX_TOUSER = 1000
+
+# background refresher renews the token after this fraction of expires_in, +- jitter
+TOKEN_REFRESH_RATIO = 0.8
+TOKEN_REFRESH_JITTER = 0.05
+TOKEN_REFRESH_RETRY_DELAY = 30
+
+# shared by all instances so clients with the same credentials refresh once
+_token_flight: SingleFlight[CachedToken] = SingleFlight()
+# the string escaping of json.dumps, without its dispatch on the type
+_encode_str = json.encoder.encode_basestring_ascii
+# templates kept per client, see `WecomSan.message_template`
+MAX_CACHED_TEMPLATES = 256
 
 
 def split_text(text: str, max_bytes: int) -> list[str]:
+    """Split `text` into chunks of at most `max_bytes` UTF-8 bytes without cutting characters.
+
+    A character longer than `max_bytes` gets a chunk of its own.
+    """
+    data = text.encode('utf-8')
+    total = len(data)
     chunks = []
-    current_chunk = ""
-    current_bytes = 0
+    start = 0
+    if total and max_bytes < _utf8_char_len(data[0]):
+        # kept for compatibility: an oversized first character is preceded by an empty chunk
+        chunks.append("")
+
+    while start < total:
+        end = start + max_bytes
+        if end >= total:
+            end = total
+        else:
+            # back off to the start of the character being cut
+            while end > start and 0x80 <= data[end] < 0xC0:
+                end -= 1
+            if end == start:
+                end = start + _utf8_char_len(data[start])
+        chunks.append(data[start:end].decode('utf-8'))
+        start = end
 
-    for char in text:
-        char_bytes = char.encode('utf-8')
-        if current_bytes + len(char_bytes) > max_bytes:
-            chunks.append(current_chunk)
-            current_chunk = ""
-            current_bytes = 0
+    return chunks
 
-        current_chunk += char
-        current_bytes += len(char_bytes)
 
-    if current_bytes > 0:
-        chunks.append(current_chunk)
+def _utf8_char_len(lead: int) -> int:
+    if lead < 0x80:
+        return 1
+    if lead < 0xE0:
+        return 2
+    if lead < 0xF0:
+        return 3
+    return 4
 
-    return chunks
+
+def build_message(aid, touid, msgtype: str, content: dict) -> dict:
+    """Body of a message/send call.
+
+    See: https://developer.work.weixin.qq.com/document/path/90236
+    """
+    return {
+        "touser": touid,
+        "agentid": aid,
+        "msgtype": msgtype,
+        msgtype: content,
+        "duplicate_check_interval": 600
+    }
+
+
+class MessageTemplate:
+    """Pre-encoded message/send body for a fixed touid and msgtype.
+
+    Everything but the content is encoded once; `render` only escapes the
+    content and splices it in. Renders the same JSON as `json.dumps` of
+    `build_message` with `{"content": content}`, plus `extra` fields.
+    """
+
+    _SENTINEL = '\x00wecomsan-content\x00'
+
+    def __init__(self, aid, touid, msgtype: str, extra: Optional[dict] = None):
+        self.touid = touid
+        self.msgtype = msgtype
+        data = build_message(aid, touid, msgtype, {"content": self._SENTINEL})
+        if extra:
+            data.update(extra)
+        self.prefix, self.suffix = json.dumps(data).split(_encode_str(self._SENTINEL))
+
+    def render(self, content: str) -> str:
+        return self.prefix + _encode_str(content) + self.suffix
+
+
+def check_upload(filelength: int, media_type: MediaType):
+    """Raises:
+        `WecomSanUploadError` if the file size is out of the limits of `media_type`.
+    """
+    try:
+        assert filelength > 5, '所有文件大小必须大于5个字节'
+        if media_type == 'image':
+            assert filelength <= 10*1024*1024, '图片不得超过10MB'
+        elif media_type == 'voice':
+            assert filelength <= 2*1024*1024, '语音不得超过2MB'
+        elif media_type == 'video':
+            assert filelength <= 10*1024*1024, '视频不得超过10MB'
+        elif media_type == 'file':
+            assert filelength <= 20*1024*1024, '普通文件不得超过20MB'
+    except AssertionError as e:
+        raise WecomSanUploadError(e)
+
+
+def _errcode(resp: requests.Response, codec: JsonCodec) -> Optional[int]:
+    errcode = parse_errcode(resp.content)
+    if errcode is not None:
+        return errcode
+    try:
+        return codec.decode(WecomApiRespBase, resp.content).errcode
+    except ValueError:
+        return None
+
+
+def _rewind(prep: requests.PreparedRequest):
+    if hasattr(prep.body, 'seek'):
+        # streamed multipart body
+        prep.body.seek(0)
 
 
 class WecomSan:
-    def __init__(self, cid, aid, secret, **requests_kwargs):
+    def __init__(self, cid, aid, secret, *, token_refresh_margin=300, token_store: Optional[TokenStore] = None,
+                 token_wait_timeout: Optional[float] = 30, auto_refresh_token=False,
+                 pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE,
+                 media_cache: Optional[MediaCache] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, codec: Optional[JsonCodec] = None,
+                 fast_responses=False, fast_transport=False, **requests_kwargs):
+        """`token_refresh_margin` is how many seconds before `expires_in` runs out the
+        cached access token is considered stale and fetched again.
+
+        `token_store` shares the access token with other instances and processes,
+        e.g. a `FileTokenStore` or `SqliteTokenStore` on a common path. Defaults to
+        a `MemoryTokenStore` private to this instance.
+
+        Concurrent refreshes for the same (corpid, secret) in this process are
+        coalesced into one gettoken call. Callers waiting on it give up with
+        `WecomSanTimeoutError` after `token_wait_timeout` seconds.
+
+        `auto_refresh_token` starts a background thread renewing the token at about
+        80% of `expires_in`, so sends never wait on gettoken. Stop it with `close()`.
+
+        Requests go through one keep-alive `Session` owned by this instance.
+        `pool_connections` and `pool_maxsize` are passed to its `HTTPAdapter`;
+        raise `pool_maxsize` when sending from more threads than that. Release
+        the connections with `close()` or by using the instance as a context manager.
+
+        `media_cache`, e.g. a `MemoryMediaCache` or `SqliteMediaCache`, remembers
+        uploaded media by content and corp, so sending the same file again reuses its
+        media_id. One cache can be shared by clients of different corps.
+
+        `rate_limiter` throttles messages client-side, see `RateLimiter`.
+
+        `retry_policy` retries calls failing with transient errcodes or transport
+        errors, see `RetryPolicy`. By default nothing is retried.
+
+        `codec` encodes request bodies and decodes responses, by default orjson or
+        msgspec if installed, see `default_codec`.
+
+        With `fast_responses`, senders and uploads return a `WecomApiRespLite`:
+        the errcode is checked on the raw bytes and the pydantic model is only
+        built once a field other than errcode or msgid is read.
+
+        With `fast_transport`, gettoken and message calls go through a `WecomTransport`
+        straight to urllib3 instead of `Session.send`. Proxies and CA bundle
+        are then resolved from the environment once, here. Can't be combined
+        with `cookies`, `auth` or `hooks`, and redirects are not followed.
+        """
         self.cid = cid
         self.aid = aid
         self.secret = secret
+        self.token_refresh_margin = token_refresh_margin
+        self.token_store = token_store if token_store is not None else MemoryTokenStore()
+        self.token_wait_timeout = token_wait_timeout
+        self.media_cache = media_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.codec = codec if codec is not None else default_codec()
+        self.fast_responses = fast_responses
         self.requests_kwargs = requests_kwargs
+        self._token_key = token_key(cid, secret)
+        self._token: Optional[CachedToken] = None
+        self._templates: dict = {}
+        self._templates_lock = threading.Lock()
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.transport: Optional[WecomTransport] = None
+        if fast_transport:
+            unsupported = {'cookies', 'auth', 'hooks'} & requests_kwargs.keys()
+            if unsupported:
+                raise ValueError(f'fast_transport does not support {", ".join(sorted(unsupported))}')
+            self.transport = WecomTransport(
+                self.session, API_BASE, timeout=requests_kwargs.get('timeout'),
+                proxies=requests_kwargs.get('proxies'), verify=requests_kwargs.get('verify'),
+                cert=requests_kwargs.get('cert'), headers=requests_kwargs.get('headers'),
+            )
+        self._closed = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        if auto_refresh_token:
+            self.start_token_refresher()
+
+    def _is_fresh(self, token: Optional[CachedToken], min_ttl: Optional[float] = None) -> bool:
+        if min_ttl is None:
+            min_ttl = self.token_refresh_margin
+        return token is not None and time.time() < token.expires_at - min_ttl
 
     @property
     def access_token(self):
-        get_token_url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={self.cid}&corpsecret={self.secret}"
-        access_token = requests.get(get_token_url, **self.requests_kwargs).json().get('access_token')
-        if access_token and len(access_token) > 0:
-            return access_token
+        """Cached access token, fetched again once it is within `token_refresh_margin` of expiring."""
+        token = self._token
+        if not self._is_fresh(token):
+            token = self._token = _token_flight.do(self._token_key, self._load_token, self.token_wait_timeout)
+        return token.access_token
 
-        raise ModuleNotFoundError('fail to get access token')
+    def _load_token(self, min_ttl: Optional[float] = None) -> CachedToken:
+        # another instance or process may have refreshed it already
+        token = self.token_store.get(self._token_key)
+        if not self._is_fresh(token, min_ttl):
+            with self.token_store.lock(self._token_key):
+                token = self.token_store.get(self._token_key)
+                if not self._is_fresh(token, min_ttl):
+                    token = self._get_token()
+                    self.token_store.set(self._token_key, token)
+        return token
 
-    def send(self, text, touid='@all') -> WecomApiRespBase:
-        """touid can be UserID1. use '|' to join multiple userids.
-        See: https://developer.work.weixin.qq.com/document/path/90236
-        Use <a> to link to a URL
+    def start_token_refresher(self):
+        """Start renewing the access token in a background thread, see `auto_refresh_token`."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._closed.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name='wecomsan-token-refresher', daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        delay = 0.0
+        # fraction of expires_in left when renewing, first round takes whatever is valid now
+        remaining = None
+        while not self._closed.wait(delay):
+            try:
+                token = self._token
+                min_ttl = token.expires_in * remaining if token is not None and remaining is not None else None
+                token = self._token = _token_flight.do(
+                    self._token_key, lambda: self._load_token(min_ttl), self.token_wait_timeout
+                )
+            except Exception:
+                logger.warning('background access token refresh failed', exc_info=True)
+                delay = TOKEN_REFRESH_RETRY_DELAY
+                continue
+
+            # jitter so processes sharing a store don't all wake up at once
+            remaining = 1 - TOKEN_REFRESH_RATIO + random.uniform(-TOKEN_REFRESH_JITTER, TOKEN_REFRESH_JITTER)
+            delay = max(token.expires_at - token.expires_in * remaining - time.time(), 0.0)
+
+    def close(self):
+        """Stop the background token refresher if running and close pooled connections."""
+        self._closed.set()
+        refresher, self._refresher = self._refresher, None
+        if refresher is not None and refresher is not threading.current_thread():
+            refresher.join()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def cached_token(self) -> Optional[CachedToken]:
+        """The access token this instance currently holds, None if nothing is cached."""
+        return self._token
+
+    @property
+    def token_expires_at(self) -> float:
+        """Unix timestamp at which the cached access token expires, 0 if nothing is cached."""
+        return self._token.expires_at if self._token is not None else 0.0
+
+    @property
+    def token_ttl(self) -> float:
+        """Seconds left before the cached access token expires, 0 if nothing is cached."""
+        return max(0.0, self.token_expires_at - time.time())
+
+    def _get_token(self) -> CachedToken:
+        """Fetch a new access token from gettoken.
+
+        See:
+            https://developer.work.weixin.qq.com/document/path/91039
         """
-        send_msg_url = f'https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={self.access_token}'
-        data = {
-            "touser": touid,
-            "agentid": self.aid,
-            "msgtype": "text",
-            "text": {
-                "content": text
-            },
-            "duplicate_check_interval": 600
-        }
-        resp = requests.post(send_msg_url, data=json.dumps(data), **self.requests_kwargs)
+        get_token_url = f"{API_BASE}gettoken?corpid={self.cid}&corpsecret={self.secret}"
+        requested_at = time.time()
+        if self.transport is not None:
+            req = self.transport.prepare('GET')
+            req.prepare_url(get_token_url, {})
+            resp = self.transport.send(req)
+        else:
+            resp = self.session.get(get_token_url, **self.requests_kwargs)
+            resp.encoding = 'utf-8'
+        respModel = self.codec.decode(WecomApiRespGetToken, resp.content)
+        if respModel.errcode != SUCCESS or not respModel.access_token:
+            raise ModuleNotFoundError('fail to get access token')
+        return CachedToken(respModel.access_token, requested_at + respModel.expires_in, respModel.expires_in)
+
+    def refresh_token(self) -> str:
+        """Fetch a new access token regardless of the cached one and store it."""
+        with self.token_store.lock(self._token_key):
+            token = self._get_token()
+            self.token_store.set(self._token_key, token)
+        self._token = token
+        return token.access_token
+
+    def invalidate_token(self, access_token: Optional[str] = None):
+        """Drop the cached access token so the next access fetches a new one.
+
+        If `access_token` is given, it is only dropped if it is still the cached one.
+        The shared store entry is only dropped if it still holds the same token,
+        so a token another process has just refreshed is kept.
+        """
+        token = self._token
+        if access_token is None and token is not None:
+            access_token = token.access_token
+        if token is not None and token.access_token == access_token:
+            self._token = None
+        if access_token is not None:
+            self.token_store.delete(self._token_key, access_token)
+
+    def _send_prepared(self, prep: Union[requests.PreparedRequest, TransportRequest]) -> requests.Response:
+        if isinstance(prep, TransportRequest):
+            return self.transport.send(prep)
+        kwargs = self.requests_kwargs
+        session = self.session
+        settings = session.merge_environment_settings(
+            prep.url, dict(kwargs.get('proxies') or {}), kwargs.get('stream'), kwargs.get('verify'), kwargs.get('cert')
+        )
+        resp = session.send(
+            prep, timeout=kwargs.get('timeout'), allow_redirects=kwargs.get('allow_redirects', True), **settings
+        )
+        # WeCom always answers in UTF-8; responses are parsed from `content`, and
+        # this keeps `text`/`json()` of hooks and callers from guessing the charset
+        resp.encoding = 'utf-8'
+        return resp
+
+    def _request(self, method: str, path: str, params: Optional[dict] = None,
+                 throttle: Optional[Callable[[], None]] = None, **kwargs) -> requests.Response:
+        """Call `API_BASE + path` with the access token.
+
+        If WeCom rejects the token (see `TOKEN_INVALID_ERRCODES`), it is dropped and
+        the same prepared request is sent once more with a fresh token, without
+        encoding the body again. Other failures are retried as `retry_policy` says.
+        `throttle` is called before every attempt, retries included.
+        """
+        url = API_BASE + path
+        params = dict(params or {})
+        if self.transport is not None and kwargs.keys() <= {'data'}:
+            prep = self.transport.prepare(method, kwargs.get('data'))
+        else:
+            req = requests.Request(
+                method, url,
+                headers=self.requests_kwargs.get('headers'),
+                cookies=self.requests_kwargs.get('cookies'),
+                auth=self.requests_kwargs.get('auth'),
+                hooks=self.requests_kwargs.get('hooks'),
+                **kwargs,
+            )
+            prep = self.session.prepare_request(req)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if throttle is not None:
+                throttle()
+            try:
+                resp, errcode = self._send_with_token(prep, url, params)
+            except Exception as e:
+                delay = self.retry_policy.next_delay(attempt, started, exc=e) if self.retry_policy else None
+                if delay is None:
+                    raise
+            else:
+                if self.rate_limiter is not None and errcode is not None:
+                    self.rate_limiter.feedback(errcode)
+                delay = self.retry_policy.next_delay(attempt, started, errcode=errcode) if self.retry_policy else None
+                if delay is None:
+                    return resp
+
+            time.sleep(delay)
+            _rewind(prep)
+
+    def _send_with_token(self, prep: Union[requests.PreparedRequest, TransportRequest], url: str,
+                         params: dict) -> Tuple[requests.Response, Optional[int]]:
+        access_token = self.access_token
+        prep.prepare_url(url, {**params, 'access_token': access_token})
+        resp = self._send_prepared(prep)
+        errcode = _errcode(resp, self.codec)
+        if errcode not in TOKEN_INVALID_ERRCODES:
+            return resp, errcode
+
+        self.invalidate_token(access_token)
+        prep.prepare_url(url, {**params, 'access_token': self.access_token})
+        _rewind(prep)
+        resp = self._send_prepared(prep)
+        return resp, _errcode(resp, self.codec)
+
+    def _decode(self, model_cls, content: bytes):
+        if self.fast_responses:
+            return WecomApiRespLite.parse(content, model_cls, self.codec)
+        return self.codec.decode(model_cls, content)
+
+    def _send_message(self, data: dict) -> WecomApiRespMessage:
+        if self.retry_policy is not None:
+            # let WeCom drop replays of a message that did get through
+            data.setdefault('enable_duplicate_check', 1)
+        return self._send_message_body(self.codec.dumps(data), str(data['touser']))
+
+    def message_template(self, touid, msgtype: str) -> MessageTemplate:
+        """Template of messages with a "content" from this app to `touid`, cached per (touid, msgtype)."""
+        dedup = self.retry_policy is not None
+        key = (touid, msgtype, dedup)
+        template = self._templates.get(key)
+        if template is None:
+            with self._templates_lock:
+                template = self._templates.get(key)
+                if template is None:
+                    if len(self._templates) >= MAX_CACHED_TEMPLATES:
+                        # drop the oldest
+                        del self._templates[next(iter(self._templates))]
+                    # see _send_message
+                    template = self._templates[key] = MessageTemplate(
+                        self.aid, touid, msgtype, {'enable_duplicate_check': 1} if dedup else None)
+        return template
+
+    def _send_message_body(self, body: Union[str, bytes], touser: str) -> WecomApiRespMessage:
+        throttle = None
+        if self.rate_limiter is not None:
+            # a retry after 45009/45033 waits out the pause the limiter took from it
+            throttle = functools.partial(self.rate_limiter.acquire, self.cid, self.aid, touser.split('|'))
+        resp = self._request('POST', 'message/send', data=body, throttle=throttle)
         # resp example:
         # fail: {'errcode': 60020, 'errmsg': 'not allow to access from your ip, hint: [1689001883303762673458360], from ip: xxx.xxx.xxx.xxx, more info at https://open.work.weixin.qq.com/devtool/query?e=60020'}
         # success: {'errcode': 0, 'errmsg': 'ok', 'msgid': '3yzdAQ63LCLTa8NCVqmn2XDsTL3oQir4vxSu6NZvYrF186IzBMslYUNRJi9fEfyPMTKKb2gJBEEiRo3PLa7tag'}
-        respModel = WecomApiRespBase.model_validate_json(resp.content)
+        respModel = self._decode(WecomApiRespMessage, resp.content)
         if respModel.errcode != SUCCESS:
             raise WecomSanRespError(respModel.errcode, respModel.errmsg)
         return respModel
 
+    def send_bulk(self, message: Union[str, dict], userids: Iterable[str],
+                  max_workers: Optional[int] = None) -> WecomBulkResult:
+        """Send `message` to any number of `userids`, `MAX_TOUSER` per call.
+
+        `message` is a text, or a message/send body without touser and agentid,
+        e.g. `{"msgtype": "markdown", "markdown": {"content": "..."}}`. It is
+        serialized once, only touser differs between the calls. Calls run in
+        parallel on up to `max_workers` threads, by default the pool size.
+        Failing calls don't stop the others, see `WecomBulkResult.errors`.
+        """
+        if isinstance(message, str):
+            message = {"msgtype": "text", "text": {"content": message}}
+        data = {"agentid": self.aid, "duplicate_check_interval": 600, **message}
+        if self.retry_policy is not None:
+            data.setdefault('enable_duplicate_check', 1)
+        # '{"touser":...,' is spliced in front of the rest of the body
+        rest = self.codec.dumps(data)[1:]
+
+        userids = list(userids)
+        chunks = ['|'.join(userids[i:i + MAX_TOUSER]) for i in range(0, len(userids), MAX_TOUSER)]
+
+        def send_chunk(touser):
+            return self._send_message_body(b'{"touser":' + self.codec.dumps(touser) + b',' + rest, touser)
+
+        result = WecomBulkResult()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers or self.pool_maxsize, len(chunks)))) as executor:
+            futures = [executor.submit(send_chunk, touser) for touser in chunks]
+            for touser, future in zip(chunks, futures):
+                try:
+                    resp = future.result()
+                except Exception as e:
+                    result.errors.append(e)
+                    result.failed_userids.extend(touser.split('|'))
+                    continue
+                result.responses.append(resp)
+                if resp.invaliduser:
+                    result.invaliduser.extend(resp.invaliduser.split('|'))
+                if resp.unlicenseduser:
+                    result.unlicenseduser.extend(resp.unlicenseduser.split('|'))
+        return result
+
+    def send(self, text, touid='@all') -> WecomApiRespBase:
+        """touid can be UserID1. use '|' to join multiple userids.
+        See: https://developer.work.weixin.qq.com/document/path/90236
+        Use <a> to link to a URL
+        """
+        return self._send_message_body(self.message_template(touid, "text").render(text), str(touid))
+
     def send_autosplit(self, text, touid='@all', max_content_bytes=2048) -> bool:
         """split text into `max_content_bytes` chunks before sending."""
         resps = []
@@ -84,52 +540,68 @@ class WecomSan:
             resps.append(self.send(chunk, touid))
         return resps
 
-    def send_image(self, base64_content, touid='@all') -> Optional[WecomApiRespBase]:
-        upload_url = f'https://qyapi.weixin.qq.com/cgi-bin/media/upload?access_token={self.access_token}&type=image'
-        upload_response = requests.post(upload_url, files={
-            "picture": base64.b64decode(base64_content)
-        }, **self.requests_kwargs).json()
-        if "media_id" in upload_response:
-            media_id = upload_response['media_id']
-        else:
+    def send_image(self, content: MediaContent, touid='@all', filename: Optional[str] = None) -> Optional[WecomApiRespBase]:
+        """`content` is a base64 `str`, raw bytes-like, a path or a binary file object.
+
+        Bytes consisting of base64 characters only are decoded as base64, as raw
+        image bytes never do. Base64 is decoded chunk by chunk while uploading.
+        Returns None if the upload is rejected.
+        """
+        if isinstance(content, (bytes, bytearray, memoryview)) and is_base64(content):
+            content = Base64Reader(content)
+        try:
+            media_id = self._upload_media('image', content, filename, None, base64_str=True)
+        except WecomSanRespError:
             return None
 
-        send_msg_url = f'https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={self.access_token}'
-        data = {
-            "touser": touid,
-            "agentid": self.aid,
-            "msgtype": "image",
-            "image": {
-                "media_id": media_id
-            },
-            "duplicate_check_interval": 600
-        }
-        resp = requests.post(send_msg_url, data=json.dumps(data), **self.requests_kwargs)
-        respModel = WecomApiRespBase.model_validate_json(resp.content)
-        if respModel.errcode != SUCCESS:
-            raise WecomSanRespError(respModel.errcode, respModel.errmsg)
-        return respModel
+        data = build_message(self.aid, touid, "image", {
+            "media_id": media_id
+        })
+        return self._send_message(data)
+
+    def send_file(self, content: MediaContent, touid='@all', filename: Optional[str] = None,
+                  content_type: Optional[str] = None) -> WecomApiRespBase:
+        """`content` is raw bytes-like, a path or a binary file object, streamed into the upload.
+
+        `filename` is shown to the recipient, defaults to the name of the file.
+        """
+        media_id = self._upload_media('file', content, filename, content_type)
+        data = build_message(self.aid, touid, "file", {
+            "media_id": media_id
+        })
+        return self._send_message(data)
+
+    def send_video(self, content: MediaContent, touid='@all', title: Optional[str] = None,
+                   description: Optional[str] = None, filename: Optional[str] = None) -> WecomApiRespBase:
+        """MP4 only, see `send_file` for `content`."""
+        media_id = self._upload_media('video', content, filename, 'video/mp4')
+        video = {"media_id": media_id}
+        if title is not None:
+            video["title"] = title
+        if description is not None:
+            video["description"] = description
+        data = build_message(self.aid, touid, "video", video)
+        return self._send_message(data)
+
+    def send_voice(self, content: MediaContent, touid='@all', filename: Optional[str] = None) -> WecomApiRespBase:
+        """AMR only, see `send_file` for `content`."""
+        media_id = self._upload_media('voice', content, filename, 'audio/amr')
+        data = build_message(self.aid, touid, "voice", {
+            "media_id": media_id
+        })
+        return self._send_message(data)
+
+    def _upload_media(self, media_type: MediaType, content: MediaContent, filename: Optional[str],
+                      content_type: Optional[str], base64_str=False) -> MediaId:
+        with open_media(content, base64_str) as (fp, filelength, name):
+            return self.upload_temp_media(filename or name or media_type, fp, filelength, content_type, media_type).media_id
 
     def send_markdown(self, text, touid='@all') -> WecomApiRespBase:
         """Only supported in wecom app, not wechat.
 
         Not supported: ![alt](url)
         """
-        send_msg_url = f'https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={self.access_token}'
-        data = {
-            "touser": touid,
-            "agentid": self.aid,
-            "msgtype": "markdown",
-            "markdown": {
-                "content": text
-            },
-            "duplicate_check_interval": 600
-        }
-        resp = requests.post(send_msg_url, data=json.dumps(data), **self.requests_kwargs)
-        respModel = WecomApiRespBase.model_validate_json(resp.content)
-        if respModel.errcode != SUCCESS:
-            raise WecomSanRespError(respModel.errcode, respModel.errmsg)
-        return respModel
+        return self._send_message_body(self.message_template(touid, "markdown").render(text), str(touid))
 
     def send_textcard(self, title, description, url, btntxt='详情', touid='@all'):
         """Supports WeChat, but btntxt is not changeable in WeChat.
@@ -142,35 +614,26 @@ class WecomSan:
             description limit: 512 bytes
             url limit: 2048 bytes
         """
-        send_msg_url = f'https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={self.access_token}'
-        data = {
-            "touser": touid,
-            "agentid": self.aid,
-            "msgtype": "textcard",
-            "textcard": {
-                "title": title,
-                "description": description,
-                "url": url,
-                "btntxt": btntxt,
-            },
-            "duplicate_check_interval": 600
-        }
-        resp = requests.post(send_msg_url, data=json.dumps(data), **self.requests_kwargs)
-        respModel = WecomApiRespBase.model_validate_json(resp.content)
-        if respModel.errcode != SUCCESS:
-            raise WecomSanRespError(respModel.errcode, respModel.errmsg)
-        return respModel
+        data = build_message(self.aid, touid, "textcard", {
+            "title": title,
+            "description": description,
+            "url": url,
+            "btntxt": btntxt,
+        })
+        return self._send_message(data)
 
     def upload_temp_media(
         self,
         filename: str,
-        content: Union[str, TextIO],
+        content: Union[str, bytes, bytearray, memoryview, TextIO, BinaryIO],
         filelength: int,
-        content_type: str,
+        content_type: Optional[str],
         media_type: MediaType,
     ) -> WecomApiRespUploadTempMedia:
         """Upload temp media file, expire in 3 days.
 
+        Binary seekable file objects are streamed from their current position.
+
         Note:
             大小限制：
             所有文件size必须大于5个字节
@@ -186,28 +649,37 @@ class WecomSan:
             `WecomSanUploadError`, `WecomSanRespError`
 
         """
-        try:
-            assert filelength > 5, '所有文件大小必须大于5个字节'
-            if media_type == 'image':
-                assert filelength <= 10*1024*1024, '图片不得超过10MB'
-            elif media_type == 'voice':
-                assert filelength <= 2*1024*1024, '语音不得超过2MB'
-            elif media_type == 'video':
-                assert filelength <= 10*1024*1024, '视频不得超过10MB'
-            elif media_type == 'file':
-                assert filelength <= 20*1024*1024, '普通文件不得超过20MB'
-        except AssertionError as e:
-            raise WecomSanUploadError(e)
-
-        upload_url = f'https://qyapi.weixin.qq.com/cgi-bin/media/upload?access_token={self.access_token}&type={media_type}'
+        check_upload(filelength, media_type)
+
+        key = None
+        if self.media_cache is not None:
+            if hasattr(content, 'read') and not is_seekable(content):
+                # hashing would consume the stream, read it once and upload the bytes
+                content = content.read()
+            key = media_key(self.cid, content, media_type, filename)
+            media = self.media_cache.get(key)
+            if media is not None:
+                return WecomApiRespUploadTempMedia(
+                    errcode=SUCCESS, errmsg='ok', type=media.media_type, media_id=media.media_id,
+                    created_at=media.created_at,
+                )
+
         files = {
             'media': (filename, content, content_type, dict(filelength=filelength))
         }
-        resp = requests.post(upload_url, files=files, **self.requests_kwargs)
-        respModel = WecomApiRespBase.model_validate_json(resp.content)
-        if respModel.errcode == SUCCESS:
-            return WecomApiRespUploadTempMedia.model_validate_json(resp.content)
-        raise WecomSanRespError(respModel.errcode, respModel.errmsg)
+        resp = self._request('POST', 'media/upload', params={'type': media_type}, files=files)
+        if self.fast_responses:
+            respModel = self._decode(WecomApiRespUploadTempMedia, resp.content)
+            if respModel.errcode != SUCCESS:
+                raise WecomSanRespError(respModel.errcode, respModel.errmsg)
+        else:
+            respModel = self.codec.decode(WecomApiRespBase, resp.content)
+            if respModel.errcode != SUCCESS:
+                raise WecomSanRespError(respModel.errcode, respModel.errmsg)
+            respModel = self.codec.decode(WecomApiRespUploadTempMedia, resp.content)
+        if key is not None:
+            self.media_cache.set(key, CachedMedia(respModel.media_id, respModel.type, respModel.created_at.timestamp()))
+        return respModel
 
     def upload_html(
         self,